@@ -5,17 +5,25 @@ from aiogram.utils import executor
 from config.settings import REDIS_SETTINGS
 from core.bot import bot
 from core import logger
+from core.delivery import delivery_scheduler
+from core.delivery_stream import delivery_consumer
+from core.leader import LeaderElection
+from core.metrics import metrics_sampler
+from core.settings_cache import settings_cache
 from handlers.admin import register_handlers_admin
 from handlers.profile import register_handlers_profile
 from handlers.search import register_handlers_search
 from handlers.start import register_handlers_start
-from core.parser import main as parser_main
 from middlewares.ban import BanMiddleware
 from middlewares.anti_spam import ThrottlingMiddleware
 from middlewares.tech_works import TechWorksMiddleware
+from middlewares.user_context import UserContextMiddleware
 from tasks.record_load_history import (
+    flush_load_history,
     record_load_history,
 )
+from tasks.sweep_active_searchers import sweep_active_searchers
+from tasks.precompute_synonyms import precompute_synonyms_table
 
 logger.start()
 
@@ -27,14 +35,40 @@ register_handlers_profile(dp)
 register_handlers_search(dp)
 register_handlers_start(dp)
 
+dp.middleware.setup(UserContextMiddleware())
 dp.middleware.setup(TechWorksMiddleware())
 dp.middleware.setup(BanMiddleware())
 dp.middleware.setup(ThrottlingMiddleware())
 
+background_leader = LeaderElection("background_tasks")
+
+
+async def run_singleton_tasks():
+    await asyncio.gather(
+        sweep_active_searchers(),
+        precompute_synonyms_table(),
+    )
+
 
 async def on_startup(dp: Dispatcher):
-    asyncio.create_task(parser_main.main())
+    await settings_cache.refresh()
+    delivery_scheduler.configure()
+    delivery_scheduler.start()
+    # Совпадения публикует отдельный процесс парсера (app.parser)
+    delivery_consumer.start()
+    asyncio.create_task(settings_cache.listen())
     asyncio.create_task(record_load_history())
+    # Обслуживающие задачи выполняет только процесс-лидер,
+    # сколько бы экземпляров бота ни было запущено
+    asyncio.create_task(background_leader.run(run_singleton_tasks))
+
+
+async def on_shutdown(dp: Dispatcher):
+    await metrics_sampler.stop()
+    await flush_load_history(final=True)
+    await delivery_consumer.stop()
+    await delivery_scheduler.stop()
+    logger.stop()
 
 
 if __name__ == "__main__":
@@ -42,4 +76,5 @@ if __name__ == "__main__":
         dp,
         skip_updates=True,
         on_startup=on_startup,
+        on_shutdown=on_shutdown,
     )
@@ -0,0 +1,46 @@
+import asyncio
+import contextlib
+import signal
+from core import logger
+from core.leader import LeaderElection
+from core.parser import main as parser_main
+from core.parser.lemmatizer import lemma_cache
+from core.parser.nlp_batcher import nlp_batcher
+from core.parser.nlp_pool import nlp_executor
+from core.settings_cache import settings_cache
+
+logger.start("parser")
+
+# Парсер работает отдельно от бота и передает совпадения через поток
+# доставок (core.delivery_stream). Запущенных экземпляров может быть
+# несколько: каналы читает только лидер, остальные ждут его падения.
+parser_leader = LeaderElection("parser")
+
+
+async def main():
+    await settings_cache.refresh()
+    lemma_cache.load()
+    nlp_executor.start()
+    asyncio.create_task(settings_cache.listen())
+    parser_task = asyncio.create_task(parser_leader.run(parser_main.main))
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(stop_signal, stop_event.set)
+
+    try:
+        await stop_event.wait()
+    finally:
+        parser_task.cancel()
+        await asyncio.gather(parser_task, return_exceptions=True)
+        await nlp_batcher.stop()
+        nlp_executor.shutdown()
+        lemma_cache.save()
+        logger.stop()
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
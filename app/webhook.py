@@ -0,0 +1,152 @@
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+from aiogram import Bot, Dispatcher, types
+from aiohttp import web
+from config.settings import (
+    BOT_NAME,
+    WEBAPP_HOST,
+    WEBAPP_PORT,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_PATH,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    WEBHOOK_WORKERS,
+)
+from core import logger as log_setup
+from core.sharding import ShardConsumer, push_update
+from core.webhook import WebhookReceiver, create_webhook_app
+
+logger = logging.getLogger(BOT_NAME)
+
+WORKER_CHECK_INTERVAL = 5
+
+
+async def set_webhook() -> None:
+    from core.bot import bot
+
+    # drop_pending_updates=False: update, накопившиеся за время
+    # перезапуска, Telegram доставит после старта
+    await bot.set_webhook(
+        f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET,
+        drop_pending_updates=False,
+    )
+    await (await bot.get_session()).close()
+
+
+async def run_worker(index: int, workers: int) -> None:
+    # Диспетчер, соединения с базой и Redis создаются в каждом процессе свои
+    from app.main import dp, on_shutdown, on_startup
+
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+
+    async def process_update(update: dict) -> None:
+        await dp.process_update(types.Update(**update))
+
+    async def route_update(update: dict) -> None:
+        await push_update(update, workers)
+
+    # Соединение Telegram может прийти в любой процесс, поэтому при
+    # нескольких воркерах update сначала уходит в очередь шарда своего
+    # пользователя, а обрабатывает его воркер этого шарда
+    shard_consumer = None
+    if workers > 1:
+        shard_consumer = ShardConsumer(index, process_update, WEBHOOK_CONCURRENCY)
+
+    receiver = WebhookReceiver(
+        route_update if shard_consumer else process_update,
+        WEBHOOK_QUEUE_SIZE,
+        WEBHOOK_CONCURRENCY,
+        WEBHOOK_SECRET,
+    )
+    runner = web.AppRunner(create_webhook_app(receiver, WEBHOOK_PATH))
+    await runner.setup()
+    await on_startup(dp)
+    if shard_consumer:
+        shard_consumer.start()
+
+    # SO_REUSEPORT: все процессы слушают один порт, ядро распределяет
+    # соединения между ними
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT, reuse_port=workers > 1)
+    await site.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(stop_signal, stop_event.set)
+
+    try:
+        await stop_event.wait()
+    finally:
+        # Сначала дорабатываем принятые update, затем останавливаем сервисы
+        await runner.cleanup()
+        if shard_consumer:
+            await shard_consumer.stop()
+        await on_shutdown(dp)
+        await dp.storage.close()
+        await dp.storage.wait_closed()
+        await (await dp.bot.get_session()).close()
+
+
+def worker_main(index: int, workers: int) -> None:
+    # app.main запускает логирование при импорте: к этому моменту у
+    # воркера уже должно быть свое имя файла
+    log_setup.set_process_name(f"webhook{index}")
+    asyncio.run(run_worker(index, workers))
+
+
+def start_worker(index: int, workers: int) -> multiprocessing.Process:
+    process = multiprocessing.Process(target=worker_main, args=(index, workers))
+    process.start()
+    return process
+
+
+def interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def main() -> None:
+    workers = WEBHOOK_WORKERS
+    # SO_REUSEPORT и сигналы цикла событий есть только на Linux/Unix
+    if sys.platform == "win32":
+        workers = 1
+
+    asyncio.run(set_webhook())
+
+    if workers == 1:
+        worker_main(0, 1)
+        return
+
+    processes = [start_worker(index, workers) for index in range(workers)]
+    signal.signal(signal.SIGTERM, interrupt)
+    try:
+        while True:
+            # Упавший воркер перезапускается с тем же номером, иначе очередь
+            # его шарда никто не будет читать
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.error(
+                        "Воркер %s завершился с кодом %s, перезапускаем.",
+                        index,
+                        process.exitcode,
+                    )
+                    processes[index] = start_worker(index, workers)
+            time.sleep(WORKER_CHECK_INTERVAL)
+    except KeyboardInterrupt:
+        # Останавливаем воркеров и ждем, пока они доработают принятые update
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
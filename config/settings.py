@@ -29,6 +29,8 @@ REDIS_SETTINGS = {
 
 LOG_LEVEL = os.getenv("LOG_LEVEL")
 LOG_LEVEL = getattr(logging, LOG_LEVEL)
+LOG_MODE = os.getenv("LOG_MODE") or "queue"
+LOG_FORMAT = os.getenv("LOG_FORMAT") or "text"
 
 RECORD_INTERVAL = int(os.getenv("RECORD_INTERVAL"))
 
@@ -40,3 +42,23 @@ API_HASH = os.getenv("API_HASH")
 
 PHONE_NUMBER = os.getenv("PHONE_NUMBER")
 PASSWORD = os.getenv("PASSWORD")
+
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE") or 100000)
+LEMMA_CACHE_PATH = os.getenv("LEMMA_CACHE_PATH") or None
+
+NLP_WORKERS = int(os.getenv("NLP_WORKERS") or 2)
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE") or 64)
+NLP_BATCH_WAIT = float(os.getenv("NLP_BATCH_WAIT") or 0.5)
+
+METRICS_SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL") or 1.0)
+METRICS_BUFFER_SIZE = int(os.getenv("METRICS_BUFFER_SIZE") or 3600)
+METRICS_DOWNSAMPLE_PERIOD = int(os.getenv("METRICS_DOWNSAMPLE_PERIOD") or 60)
+
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH") or "/webhook"
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+WEBAPP_HOST = os.getenv("WEBAPP_HOST") or "0.0.0.0"
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT") or 8080)
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS") or 2)
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE") or 1000)
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY") or 16)
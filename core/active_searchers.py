@@ -0,0 +1,61 @@
+import logging
+import time
+from typing import Iterable, List, Set
+from config.settings import BOT_NAME
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+# Реестр активных поисков: sorted set, где участник - Telegram user_id,
+# а score - unix-время, до которого поиск считается активным.
+ACTIVE_SEARCHERS_KEY = "active_searchers"
+
+
+async def activate_searcher(user_id: int, ttl: int) -> None:
+    await redis.zadd(ACTIVE_SEARCHERS_KEY, {user_id: time.time() + ttl})
+    logger.debug("Пользователь %s добавлен в реестр активных поисков.", user_id)
+
+
+async def deactivate_searcher(user_id: int) -> None:
+    await redis.zrem(ACTIVE_SEARCHERS_KEY, user_id)
+    logger.debug("Пользователь %s удален из реестра активных поисков.", user_id)
+
+
+async def refresh_searcher(user_id: int, ttl: int) -> None:
+    # xx=True не добавляет пользователя, если его поиск уже остановлен
+    await redis.zadd(ACTIVE_SEARCHERS_KEY, {user_id: time.time() + ttl}, xx=True)
+
+
+async def is_searcher_active(user_id: int) -> bool:
+    expires_at = await redis.zscore(ACTIVE_SEARCHERS_KEY, user_id)
+    return expires_at is not None and expires_at > time.time()
+
+
+# Пакетная проверка для цикла парсера (core.parser.main); в этом дереве
+# его нет, поэтому функция пока не вызывается.
+async def filter_active_searchers(user_ids: Iterable[int]) -> Set[int]:
+    user_ids = list(user_ids)
+    if not user_ids:
+        return set()
+
+    now = time.time()
+    scores = await redis.zmscore(ACTIVE_SEARCHERS_KEY, user_ids)
+    return {
+        user_id
+        for user_id, expires_at in zip(user_ids, scores)
+        if expires_at is not None and expires_at > now
+    }
+
+
+async def get_active_searchers() -> List[int]:
+    members = await redis.zrangebyscore(ACTIVE_SEARCHERS_KEY, time.time(), "+inf")
+    return [int(member) for member in members]
+
+
+async def sweep_expired_searchers() -> int:
+    removed = await redis.zremrangebyscore(ACTIVE_SEARCHERS_KEY, "-inf", time.time())
+    if removed:
+        logger.debug(
+            "Из реестра активных поисков удалено %s истекших записей.", removed
+        )
+    return removed
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.settings import BOT_NAME, RECORD_INTERVAL
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+Loader = Callable[[], Awaitable[Any]]
+
+# Доля случайного разброса TTL, чтобы ключи, записанные одновременно,
+# не истекали одновременно
+TTL_JITTER = 0.1
+# Чем больше beta, тем раньше до истечения начинается фоновое обновление
+EARLY_REFRESH_BETA = 1.0
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+# Удаляет блокировку, только если она все еще принадлежит нам
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Загрузки, которые уже выполняются в этом процессе, по ключу кэша
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def jittered_ttl(ttl: int, jitter: float = TTL_JITTER) -> int:
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _should_refresh_early(entry: dict, beta: float) -> bool:
+    # XFetch: вероятность обновления растет по мере приближения к
+    # истечению и пропорциональна времени загрузки значения
+    delta = entry.get("delta", 0)
+    return time.time() - delta * beta * math.log(random.random()) >= entry["expires_at"]
+
+
+def _parse_entry(raw: Optional[str]) -> Optional[dict]:
+    if raw is None:
+        return None
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        return None
+    # Значения, записанные до перехода на загрузчик, считаем промахом
+    if not isinstance(entry, dict) or "value" not in entry or "expires_at" not in entry:
+        return None
+    return entry
+
+
+async def _load_and_store(key: str, loader: Loader, ttl: int) -> Any:
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    locked = await redis.set(lock_key, token, nx=True, ex=LOCK_TIMEOUT)
+
+    if not locked:
+        # Значение загружает другой процесс: ждем его результат
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = _parse_entry(await redis.get(key))
+            if entry is not None:
+                return entry["value"]
+            if not await redis.exists(lock_key):
+                break
+        logger.debug("Не дождались загрузки %s другим процессом, загружаем сами.", key)
+
+    try:
+        started_at = time.monotonic()
+        value = await loader()
+        delta = time.monotonic() - started_at
+
+        if value is not None:
+            ttl = jittered_ttl(ttl)
+            entry = {
+                "value": value,
+                "delta": round(delta, 4),
+                "expires_at": time.time() + ttl,
+            }
+            await redis.set(key, json.dumps(entry), ex=ttl)
+            logger.debug("Кэш %s загружен из базы за %.3f сек.", key, delta)
+        return value
+    finally:
+        if locked:
+            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+
+def single_flight(key: str, factory: Loader) -> asyncio.Task:
+    # Одновременные вызовы с одним ключом получают одну и ту же задачу
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+def _single_flight(key: str, loader: Loader, ttl: int) -> asyncio.Task:
+    return single_flight(key, lambda: _load_and_store(key, loader, ttl))
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        logger.error(f"Ошибка фонового обновления кэша: {str(task.exception())}")
+
+
+async def get_or_load(
+    key: str,
+    loader: Loader,
+    ttl: int = RECORD_INTERVAL,
+    beta: float = EARLY_REFRESH_BETA,
+) -> Any:
+    entry = _parse_entry(await redis.get(key))
+
+    if entry is not None:
+        if _should_refresh_early(entry, beta):
+            # Текущее значение еще живо: отдаем его, а обновляем в фоне
+            _single_flight(key, loader, ttl).add_done_callback(_log_refresh_error)
+        return entry["value"]
+
+    return await asyncio.shield(_single_flight(key, loader, ttl))
+
+
+async def invalidate(*keys: str) -> None:
+    await redis.delete(*keys)
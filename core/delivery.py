@@ -0,0 +1,209 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+from aiogram.utils.exceptions import RetryAfter
+from config.settings import BOT_NAME
+from core.bot import bot
+from core.redis_client import redis
+from core.settings_cache import get_settings
+
+logger = logging.getLogger(BOT_NAME)
+
+# Ограничения Bot API: около 30 сообщений в секунду на бота и около
+# одного сообщения в секунду в один чат
+GLOBAL_RATE = 30
+CHAT_INTERVAL = 1.0
+SEND_RATE_WINDOW = 60
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NOTIFICATION = 1
+
+
+# Корзины общие для всех процессов бота: лимиты Bot API считаются на бота,
+# а не на процесс, поэтому N процессов не отправят N * GLOBAL_RATE в секунду
+RATE_LIMIT_GLOBAL_KEY = "delivery:rate:global"
+RATE_LIMIT_CHAT_KEY = "delivery:rate:chat:{chat_id}"
+# Пауза после 429 тоже общая: Telegram ограничивает бота целиком
+RATE_LIMIT_PAUSE_KEY = "delivery:rate:paused"
+
+# Берет жетон из общей корзины и из корзины чата, только если он есть в
+# обеих. Возвращает задержки в мс до готовности чата и общей корзины.
+# Время берется из Redis, чтобы часы разных хостов не расходились.
+ACQUIRE_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local function refill(key, rate, capacity)
+    local state = redis.call("HMGET", key, "tokens", "updated_at")
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    return math.min(capacity, tokens + (now - updated_at) * rate / 1000)
+end
+
+local function delay(tokens, rate)
+    if tokens >= 1 then
+        return 0
+    end
+    return math.ceil((1 - tokens) * 1000 / rate)
+end
+
+local function take(key, tokens, rate, capacity)
+    redis.call("HSET", key, "tokens", tostring(tokens - 1), "updated_at", now)
+    -- Полная корзина ничем не отличается от отсутствующей
+    redis.call("PEXPIRE", key, math.ceil(capacity * 1000 / rate))
+end
+
+local global_rate, global_capacity = tonumber(ARGV[1]), tonumber(ARGV[2])
+local chat_rate, chat_capacity = tonumber(ARGV[3]), tonumber(ARGV[4])
+local global_tokens = refill(KEYS[1], global_rate, global_capacity)
+local chat_tokens = refill(KEYS[2], chat_rate, chat_capacity)
+
+local chat_delay = delay(chat_tokens, chat_rate)
+local global_delay = math.max(delay(global_tokens, global_rate), redis.call("PTTL", KEYS[3]))
+if chat_delay > 0 or global_delay > 0 then
+    return {chat_delay, global_delay}
+end
+
+take(KEYS[1], global_tokens, global_rate, global_capacity)
+take(KEYS[2], chat_tokens, chat_rate, chat_capacity)
+return {0, 0}
+"""
+
+acquire_script = redis.register_script(ACQUIRE_SCRIPT)
+
+
+class DeliveryScheduler:
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE,
+        chat_interval: float = CHAT_INTERVAL,
+        workers: int = 4,
+    ):
+        self.global_rate = global_rate
+        self.chat_interval = chat_interval
+        self.workers = workers
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._paused_until = 0.0
+        self._sent_at: deque = deque()
+
+    async def _acquire(self, chat_id: int) -> Tuple[float, float]:
+        # Задержки в секундах до готовности чата и общей корзины; жетоны
+        # списаны, только если обе равны нулю
+        chat_delay, global_delay = await acquire_script(
+            keys=[
+                RATE_LIMIT_GLOBAL_KEY,
+                RATE_LIMIT_CHAT_KEY.format(chat_id=chat_id),
+                RATE_LIMIT_PAUSE_KEY,
+            ],
+            args=[self.global_rate, self.global_rate, 1 / self.chat_interval, 1],
+        )
+        return chat_delay / 1000, global_delay / 1000
+
+    def _record_send(self) -> None:
+        # Окно обрезается при каждой отправке, а не только при чтении
+        # статистики: иначе очередь отметок растет без ограничений
+        now = time.monotonic()
+        self._sent_at.append(now)
+        while self._sent_at[0] < now - SEND_RATE_WINDOW:
+            self._sent_at.popleft()
+
+    def configure(self) -> None:
+        settings = get_settings()
+        self.chat_interval = max(settings.message_send_interval, CHAT_INTERVAL)
+        self.workers = settings.message_concurrency_limit
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.debug("Планировщик отправки запущен: %s воркеров.", self.workers)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(
+        self, chat_id: int, text: str, priority: int = PRIORITY_NOTIFICATION, **kwargs
+    ) -> asyncio.Future:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            (priority, next(self._sequence), chat_id, text, kwargs, future)
+        )
+        return future
+
+    async def send(
+        self, chat_id: int, text: str, priority: int = PRIORITY_NOTIFICATION, **kwargs
+    ):
+        return await self.enqueue(chat_id, text, priority, **kwargs)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            _, _, chat_id, text, kwargs, future = job
+
+            try:
+                while True:
+                    chat_delay, global_delay = await self._acquire(chat_id)
+                    if chat_delay or not global_delay:
+                        break
+                    await asyncio.sleep(global_delay)
+
+                if chat_delay:
+                    # Чат еще не готов: возвращаем сообщение в очередь, чтобы
+                    # не блокировать воркер ради одного получателя
+                    asyncio.get_running_loop().call_later(
+                        chat_delay, self._queue.put_nowait, job
+                    )
+                    continue
+
+                message = await bot.send_message(chat_id, text, **kwargs)
+                self._record_send()
+                if not future.done():
+                    future.set_result(message)
+            except RetryAfter as e:
+                self._paused_until = time.monotonic() + e.timeout
+                await redis.set(RATE_LIMIT_PAUSE_KEY, 1, ex=e.timeout)
+                logger.debug(
+                    "Получен 429, отправка приостановлена на %s сек.", e.timeout
+                )
+                self._queue.put_nowait(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при отправке сообщения в чат {chat_id}: {str(e)}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    @property
+    def send_rate(self) -> float:
+        now = time.monotonic()
+        while self._sent_at and self._sent_at[0] < now - SEND_RATE_WINDOW:
+            self._sent_at.popleft()
+        return len(self._sent_at) / SEND_RATE_WINDOW
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "send_rate_per_sec": round(self.send_rate, 3),
+            "paused_for_sec": max(0.0, round(self._paused_until - time.monotonic(), 3)),
+        }
+
+
+delivery_scheduler = DeliveryScheduler()
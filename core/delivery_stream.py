@@ -0,0 +1,402 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from aiogram.utils.exceptions import BadRequest, Unauthorized
+from redis.exceptions import ResponseError
+from config.settings import BOT_NAME
+from core.delivery import delivery_scheduler
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+Sender = Callable[..., Awaitable[object]]
+
+# Поток найденных парсером совпадений. Парсер только публикует записи,
+# отправляют их процессы бота из группы потребителей DELIVERY_GROUP.
+DELIVERY_STREAM_KEY = "deliveries"
+DELIVERY_GROUP = "bot"
+# Приблизительный предел длины потока (MAXLEN ~)
+DELIVERY_STREAM_MAXLEN = 100_000
+
+DELIVERY_BATCH_SIZE = 100
+DELIVERY_BLOCK_MS = 1000
+# Запись, не подтвержденная за это время, забирается другим потребителем
+DELIVERY_CLAIM_IDLE_MS = 60_000
+DELIVERY_CLAIM_INTERVAL = 30
+# Записи, ожидающие отправки в планировщике, можно ждать дольше
+# claim_idle_ms: их время простоя сбрасывается (XCLAIM JUSTID) чаще, чем
+# раз в claim_idle_ms, чтобы их не забрал и не отправил повторно другой
+# потребитель
+DELIVERY_KEEPALIVE_DIVISOR = 3
+
+# Неудачная отправка повторяется через 5, 10, 20, 40 сек., после
+# DELIVERY_MAX_ATTEMPTS попыток запись уходит в поток {stream}:dead
+DELIVERY_MAX_ATTEMPTS = 5
+DELIVERY_RETRY_BASE_DELAY = 5
+DELIVERY_RETRY_MAX_DELAY = 300
+DELIVERY_RETRY_INTERVAL = 1
+# Сколько помнить, что пост уже поставлен в очередь или отправлен
+DELIVERY_IDEMPOTENCY_TTL = 7 * 86400
+
+DELIVERY_QUEUED = "queued"
+DELIVERY_SENT = "sent"
+
+StreamEntry = Tuple[str, Dict[str, str]]
+
+# Запись добавляется в поток, только если ключ (пользователь, пост) новый
+ENQUEUE_SCRIPT = """
+if not redis.call("SET", KEYS[1], ARGV[1], "NX", "EX", ARGV[2]) then
+    return false
+end
+return redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], "*", unpack(ARGV, 4))
+"""
+
+# Переносит наступившие повторы из отложенного множества обратно в поток
+MOVE_DUE_RETRIES_SCRIPT = """
+local due = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+for _, payload in ipairs(due) do
+    local fields = {}
+    for name, value in pairs(cjson.decode(payload)) do
+        table.insert(fields, name)
+        table.insert(fields, value)
+    end
+    redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], "*", unpack(fields))
+    redis.call("ZREM", KEYS[1], payload)
+end
+return #due
+"""
+
+
+def get_entry_timestamp(entry_id: str) -> float:
+    # Первая часть id записи - время добавления в миллисекундах
+    return int(entry_id.split("-")[0]) / 1000
+
+
+def get_retry_key(stream: str) -> str:
+    return f"{stream}:retry"
+
+
+def get_dead_letter_key(stream: str) -> str:
+    return f"{stream}:dead"
+
+
+def get_idempotency_key(stream: str, chat_id: int, post_id: str) -> str:
+    return f"{stream}:sent:{chat_id}:{post_id}"
+
+
+def get_retry_delay(attempt: int) -> float:
+    return min(DELIVERY_RETRY_BASE_DELAY * 2 ** (attempt - 1), DELIVERY_RETRY_MAX_DELAY)
+
+
+_enqueue = redis.register_script(ENQUEUE_SCRIPT)
+_move_due_retries = redis.register_script(MOVE_DUE_RETRIES_SCRIPT)
+
+
+async def publish_delivery(
+    chat_id: int,
+    text: str,
+    post_id: Optional[str] = None,
+    stream: str = DELIVERY_STREAM_KEY,
+    **kwargs,
+) -> Optional[str]:
+    # С post_id один и тот же пост попадет к пользователю только один раз,
+    # сколько бы раз парсер его ни нашел. Возвращает None для повтора.
+    fields = {
+        "chat_id": chat_id,
+        "text": text,
+        "kwargs": json.dumps(kwargs),
+        "attempt": 1,
+    }
+    if post_id is None:
+        return await redis.xadd(
+            stream, fields, maxlen=DELIVERY_STREAM_MAXLEN, approximate=True
+        )
+
+    fields["post_id"] = post_id
+    args = [DELIVERY_QUEUED, DELIVERY_IDEMPOTENCY_TTL, DELIVERY_STREAM_MAXLEN]
+    for name, value in fields.items():
+        args.extend((name, value))
+    return await _enqueue(
+        keys=[get_idempotency_key(stream, chat_id, post_id), stream], args=args
+    )
+
+
+async def create_delivery_group(stream: str = DELIVERY_STREAM_KEY) -> None:
+    try:
+        await redis.xgroup_create(stream, DELIVERY_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        # Группа уже создана другим процессом
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+class DeliveryStreamConsumer:
+    # Читает поток доставок в группе потребителей и отправляет сообщения
+    # через планировщик. Запись подтверждается (XACK) только после отправки
+    # или постановки повтора, поэтому записи упавшего процесса остаются в
+    # списке ожидающих и через claim_idle_ms забираются живым потребителем
+    # (XAUTOCLAIM). Пока запись отправляется, ее время простоя обновляется,
+    # так что забрать ее может только потребитель упавшего процесса.
+    # Повторы ждут своего времени в sorted set {stream}:retry.
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        stream: str = DELIVERY_STREAM_KEY,
+        send: Optional[Sender] = None,
+        batch_size: int = DELIVERY_BATCH_SIZE,
+        block_ms: int = DELIVERY_BLOCK_MS,
+        claim_idle_ms: int = DELIVERY_CLAIM_IDLE_MS,
+        claim_interval: float = DELIVERY_CLAIM_INTERVAL,
+        max_attempts: int = DELIVERY_MAX_ATTEMPTS,
+    ):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stream = stream
+        self.send = send or delivery_scheduler.send
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.max_attempts = max_attempts
+        self.delivered = 0
+        self.failed = 0
+        self.claimed = 0
+        self.retried = 0
+        self.dead = 0
+        self.skipped = 0
+        self._latencies: deque = deque(maxlen=1000)
+        self._in_flight: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._run()),
+                asyncio.create_task(self._claim()),
+                asyncio.create_task(self._move_retries()),
+                asyncio.create_task(self._keep_alive()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        await create_delivery_group(self.stream)
+        while True:
+            try:
+                response = await redis.xreadgroup(
+                    DELIVERY_GROUP,
+                    self.name,
+                    {self.stream: ">"},
+                    count=self.batch_size,
+                    block=self.block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения потока доставок: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            for _, entries in response or ():
+                await self._deliver_batch(entries)
+
+    async def _claim(self) -> None:
+        while True:
+            await asyncio.sleep(self.claim_interval)
+            try:
+                await self._claim_pending()
+                logger.debug("Поток доставок: %s", await self.lag())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при повторе доставок: {str(e)}")
+
+    async def _claim_pending(self) -> None:
+        start_id = "0-0"
+        while True:
+            response = await redis.xautoclaim(
+                self.stream,
+                DELIVERY_GROUP,
+                self.name,
+                self.claim_idle_ms,
+                start_id=start_id,
+                count=self.batch_size,
+            )
+            start_id, entries = response[0], response[1]
+            # Записи, вытесненные из потока по MAXLEN, приходят без полей.
+            # Записи, которые этот процесс еще отправляет, второй раз не берем.
+            entries = [
+                (entry_id, fields)
+                for entry_id, fields in entries
+                if fields and entry_id not in self._in_flight
+            ]
+            if entries:
+                self.claimed += len(entries)
+                logger.debug("Повторно отправляется %s доставок.", len(entries))
+                await self._deliver_batch(entries)
+            if start_id == "0-0":
+                return
+
+    async def _move_retries(self) -> None:
+        while True:
+            await asyncio.sleep(DELIVERY_RETRY_INTERVAL)
+            try:
+                await _move_due_retries(
+                    keys=[get_retry_key(self.stream), self.stream],
+                    args=[time.time(), self.batch_size, DELIVERY_STREAM_MAXLEN],
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при переносе отложенных доставок: {str(e)}")
+
+    async def _keep_alive(self) -> None:
+        interval = self.claim_idle_ms / 1000 / DELIVERY_KEEPALIVE_DIVISOR
+        while True:
+            await asyncio.sleep(interval)
+            if not self._in_flight:
+                continue
+            try:
+                await redis.xclaim(
+                    self.stream,
+                    DELIVERY_GROUP,
+                    self.name,
+                    0,
+                    list(self._in_flight),
+                    justid=True,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при продлении доставок в работе: {str(e)}")
+
+    async def _deliver_batch(self, entries: List[StreamEntry]) -> None:
+        entry_ids = [entry_id for entry_id, _ in entries]
+        self._in_flight.update(entry_ids)
+        try:
+            acked = await asyncio.gather(*(self._deliver(*entry) for entry in entries))
+            acked_ids = [entry_id for entry_id, ack in zip(entry_ids, acked) if ack]
+            if acked_ids:
+                await redis.xack(self.stream, DELIVERY_GROUP, *acked_ids)
+        finally:
+            self._in_flight.difference_update(entry_ids)
+
+    async def _deliver(self, entry_id: str, fields: Dict[str, str]) -> bool:
+        chat_id = int(fields["chat_id"])
+        post_id = fields.get("post_id")
+        idempotency_key = (
+            get_idempotency_key(self.stream, chat_id, post_id) if post_id else None
+        )
+
+        try:
+            # Запись могла быть отправлена процессом, упавшим до XACK
+            if idempotency_key and await redis.get(idempotency_key) == DELIVERY_SENT:
+                self.skipped += 1
+                return True
+
+            await self.send(
+                chat_id, fields["text"], **json.loads(fields.get("kwargs") or "{}")
+            )
+        except (BadRequest, Unauthorized) as e:
+            # Чат не найден или бот заблокирован: повтор не поможет
+            self.failed += 1
+            logger.debug("Доставка %s в чат %s отброшена: %s", entry_id, chat_id, e)
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            return await self._retry_later(entry_id, fields, e)
+
+        self.delivered += 1
+        self._latencies.append(time.time() - get_entry_timestamp(entry_id))
+        if idempotency_key:
+            try:
+                await redis.set(
+                    idempotency_key,
+                    DELIVERY_SENT,
+                    ex=DELIVERY_IDEMPOTENCY_TTL,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Не удалось отметить доставку {entry_id} как отправленную: {str(e)}"
+                )
+        return True
+
+    async def _retry_later(
+        self, entry_id: str, fields: Dict[str, str], error: Exception
+    ) -> bool:
+        attempt = int(fields.get("attempt") or 1)
+        try:
+            if attempt >= self.max_attempts:
+                self.dead += 1
+                logger.error(
+                    f"Доставка {entry_id} в чат {fields['chat_id']} не удалась "
+                    f"после {attempt} попыток: {str(error)}"
+                )
+                await redis.xadd(
+                    get_dead_letter_key(self.stream),
+                    {**fields, "error": str(error)},
+                    maxlen=DELIVERY_STREAM_MAXLEN,
+                    approximate=True,
+                )
+                return True
+
+            self.retried += 1
+            retry_fields = {
+                **fields,
+                "attempt": str(attempt + 1),
+                "retry_of": entry_id,
+            }
+            await redis.zadd(
+                get_retry_key(self.stream),
+                {json.dumps(retry_fields): time.time() + get_retry_delay(attempt)},
+            )
+            return True
+        except Exception as e:
+            # Запись остается неподтвержденной и вернется через XAUTOCLAIM
+            logger.error(f"Не удалось отложить доставку {entry_id}: {str(e)}")
+            return False
+
+    async def lag(self) -> dict:
+        stats = {
+            "consumer": self.name,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "claimed": self.claimed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "skipped": self.skipped,
+            "in_flight": len(self._in_flight),
+            "pending": 0,
+            "lag": None,
+            "oldest_pending_sec": 0.0,
+            "latency_avg_sec": (
+                round(statistics.fmean(self._latencies), 3) if self._latencies else None
+            ),
+        }
+        for group in await redis.xinfo_groups(self.stream):
+            if group["name"] == DELIVERY_GROUP:
+                stats["pending"] = group["pending"]
+                # Число еще не прочитанных группой записей (Redis 7+)
+                stats["lag"] = group.get("lag")
+
+        if stats["pending"]:
+            summary = await redis.xpending(self.stream, DELIVERY_GROUP)
+            stats["oldest_pending_sec"] = round(
+                time.time() - get_entry_timestamp(summary["min"]), 3
+            )
+        stats["scheduled_retries"] = await redis.zcard(get_retry_key(self.stream))
+        return stats
+
+
+delivery_consumer = DeliveryStreamConsumer()
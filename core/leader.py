@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Sequence
+from config.settings import BOT_NAME
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+LEADER_TTL = 15
+LEADER_RENEW_INTERVAL = 5
+
+# Продлевает аренду, только если она все еще принадлежит нам
+RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Предваряет скрипты register_fenced_script: если аренда уже не наша,
+# скрипт ничего не пишет и возвращает nil
+FENCE_CHECK = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return false
+end
+"""
+
+FencedScript = Callable[..., Awaitable[Any]]
+
+
+class LeaderElection:
+    # Аренда лидерства в Redis: ключ leader:{name} с TTL. Лидер продлевает
+    # его каждые renew_interval секунд. Если процесс умер, ключ истекает
+    # через ttl секунд и лидерство забирает другой процесс.
+    def __init__(
+        self,
+        name: str,
+        ttl: int = LEADER_TTL,
+        renew_interval: int = LEADER_RENEW_INTERVAL,
+    ):
+        self.key = f"leader:{name}"
+        self.name = name
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self._renew = redis.register_script(RENEW_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def acquire(self) -> bool:
+        return bool(await redis.set(self.key, self.token, nx=True, ex=self.ttl))
+
+    async def renew(self) -> bool:
+        return bool(await self._renew(keys=[self.key], args=[self.token, self.ttl]))
+
+    async def release(self) -> None:
+        await self._release(keys=[self.key], args=[self.token])
+
+    async def is_leader(self) -> bool:
+        return await redis.get(self.key) == self.token
+
+    def register_fenced_script(self, script: str) -> FencedScript:
+        # Запись от лидера, который завис дольше ttl и еще не заметил потерю
+        # аренды, отбрасывается атомарно вместе с проверкой токена. В самом
+        # скрипте KEYS[1] и ARGV[1] заняты ключом аренды и токеном, ключи и
+        # аргументы вызывающего начинаются со второго.
+        fenced = redis.register_script(FENCE_CHECK + script)
+
+        async def call(keys: Sequence = (), args: Sequence = ()) -> Any:
+            return await fenced(keys=[self.key, *keys], args=[self.token, *args])
+
+        return call
+
+    async def run(self, task_factory: Callable[[], Awaitable[None]]) -> None:
+        # Выполняет задачу, пока процесс - лидер. При потере аренды задача
+        # отменяется, а процесс снова становится кандидатом.
+        while True:
+            try:
+                if not await self.acquire():
+                    await asyncio.sleep(self.renew_interval)
+                    continue
+
+                logger.info("Процесс стал лидером %s.", self.name)
+                task = asyncio.create_task(task_factory())
+                try:
+                    await self._hold(task)
+                finally:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    await self.release()
+                logger.info("Процесс больше не лидер %s.", self.name)
+                await asyncio.sleep(self.renew_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка выбора лидера {self.name}: {str(e)}")
+                await asyncio.sleep(self.renew_interval)
+
+    async def _hold(self, task: asyncio.Task) -> None:
+        while not task.done():
+            done, _ = await asyncio.wait({task}, timeout=self.renew_interval)
+            if done:
+                break
+            if not await self.renew():
+                logger.error("Аренда лидера %s потеряна.", self.name)
+                return
+
+        if not task.cancelled() and task.exception():
+            logger.error(
+                f"Задача лидера {self.name} завершилась с ошибкой: {str(task.exception())}"
+            )
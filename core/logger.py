@@ -1,30 +1,124 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from config.settings import LOG_LEVEL, BOT_NAME
+import queue
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from config.settings import LOG_FORMAT, LOG_LEVEL, LOG_MODE, BOT_NAME
 
 logger = logging.getLogger(BOT_NAME)
 
+LOG_MODE_SYNC = "sync"
+LOG_MODE_QUEUE = "queue"
+LOG_FORMAT_TEXT = "text"
+LOG_FORMAT_JSON = "json"
+
+# update_id и user_id обрабатываемого update для структурированных логов
+log_context: ContextVar[Optional[dict]] = ContextVar("log_context", default=None)
+
+_listener: Optional[QueueListener] = None
+# Имя процесса в имени файла лога. RotatingFileHandler не умеет ротировать
+# один файл из нескольких процессов, поэтому у каждого воркера webhook и
+# у парсера свой файл.
+_process_name: Optional[str] = None
+
+
+def set_process_name(name: Optional[str]) -> None:
+    global _process_name
+    _process_name = name
+
+
+def set_log_context(update_id: Optional[int], user_id: Optional[int]) -> None:
+    log_context.set({"update_id": update_id, "user_id": user_id})
+
+
+class LogContextFilter(logging.Filter):
+    # Выполняется в потоке, где вызван логгер: ContextVar в поток
+    # QueueListener не передается, поэтому поля копируются в запись здесь
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get() or {}
+        record.update_id = context.get("update_id")
+        record.user_id = context.get("user_id")
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "update_id": getattr(record, "update_id", None),
+            "user_id": getattr(record, "user_id", None),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def start(process_name: Optional[str] = None):
+    global _listener
+
+    if process_name is not None:
+        set_process_name(process_name)
 
-def start():
     log_dir = f"logs/{BOT_NAME}"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    log_filename = f"{BOT_NAME}.log"
-    log_filepath = os.path.join(log_dir, log_filename)
-
     logger.setLevel(LOG_LEVEL)
 
-    handler = RotatingFileHandler(
-        log_filepath, maxBytes=6 * 1024 * 1024, backupCount=6, encoding="utf-16"
-    )
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    log_name = f"{BOT_NAME}.{_process_name}" if _process_name else BOT_NAME
+
+    if LOG_FORMAT == LOG_FORMAT_JSON:
+        log_filepath = os.path.join(log_dir, f"{log_name}.jsonl")
+        handler = RotatingFileHandler(
+            log_filepath, maxBytes=6 * 1024 * 1024, backupCount=6, encoding="utf-8"
+        )
+        formatter = JsonFormatter()
+    else:
+        log_filepath = os.path.join(log_dir, f"{log_name}.log")
+        handler = RotatingFileHandler(
+            log_filepath, maxBytes=6 * 1024 * 1024, backupCount=6, encoding="utf-16"
+        )
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
+
+    context_filter = LogContextFilter()
+
+    if LOG_MODE == LOG_MODE_QUEUE:
+        # Запись в файл, ротация и вывод в консоль выполняются в отдельном
+        # потоке, цикл событий только кладет запись в очередь
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(context_filter)
+        logger.addHandler(queue_handler)
+
+        _listener = QueueListener(
+            log_queue, handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(stop)
+        return
+
+    handler.addFilter(context_filter)
+    console_handler.addFilter(context_filter)
+    logger.addHandler(handler)
     logger.addHandler(console_handler)
+
+
+def stop():
+    global _listener
+
+    # Дописывает записи, оставшиеся в очереди
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+import psutil
+from config.settings import (
+    BOT_NAME,
+    METRICS_BUFFER_SIZE,
+    METRICS_DOWNSAMPLE_PERIOD,
+    METRICS_SAMPLE_INTERVAL,
+)
+from core.redis_client import redis
+from database.database import engine
+
+logger = logging.getLogger(BOT_NAME)
+
+
+class MetricsSample(NamedTuple):
+    timestamp: float
+    cpu_load: float
+    memory_load: float
+    loop_lag_ms: float
+    rss_bytes: int
+    db_connections: int
+    redis_connections: int
+
+
+def get_db_connections() -> int:
+    return engine.pool.checkedout()
+
+
+def get_redis_connections() -> int:
+    # У пула redis нет публичного счетчика занятых соединений
+    return len(getattr(redis.connection_pool, "_in_use_connections", ()))
+
+
+class MetricsSampler:
+    # Снимает метрики процесса раз в interval секунд в кольцевой буфер.
+    # Все вызовы psutil неблокирующие: cpu_percent(interval=None) считает
+    # загрузку с момента предыдущего вызова, а не ждет секунду.
+    def __init__(
+        self,
+        interval: float = METRICS_SAMPLE_INTERVAL,
+        capacity: int = METRICS_BUFFER_SIZE,
+    ):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=capacity)
+        self.process = psutil.Process()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            psutil.cpu_percent(interval=None)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def sample(self, loop_lag: float) -> MetricsSample:
+        sample = MetricsSample(
+            timestamp=time.time(),
+            cpu_load=psutil.cpu_percent(interval=None),
+            memory_load=psutil.virtual_memory().percent,
+            loop_lag_ms=loop_lag * 1000,
+            rss_bytes=self.process.memory_info().rss,
+            db_connections=get_db_connections(),
+            redis_connections=get_redis_connections(),
+        )
+        self.samples.append(sample)
+        return sample
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_at = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            # Насколько позже запланированного проснулся цикл событий
+            loop_lag = max(0.0, loop.time() - expected_at)
+            try:
+                self.sample(loop_lag)
+            except Exception as e:
+                logger.error(f"Ошибка при сборе метрик: {str(e)}")
+
+    def drain(self, until: Optional[float] = None) -> List[MetricsSample]:
+        # С until забираются только сэмплы старше него, остальные остаются
+        # в буфере до следующего сброса
+        if until is None:
+            samples = list(self.samples)
+            self.samples.clear()
+            return samples
+
+        samples = []
+        while self.samples and self.samples[0].timestamp < until:
+            samples.append(self.samples.popleft())
+        return samples
+
+
+def downsample(
+    samples: List[MetricsSample], period: int = METRICS_DOWNSAMPLE_PERIOD
+) -> List[dict]:
+    # Средние значения загрузки и пиковые значения задержки, памяти и
+    # соединений для каждого окна в period секунд
+    buckets = {}
+    for sample in samples:
+        buckets.setdefault(int(sample.timestamp // period), []).append(sample)
+
+    rows = []
+    for bucket, bucket_samples in sorted(buckets.items()):
+        cpu_load = sum(sample.cpu_load for sample in bucket_samples) / len(
+            bucket_samples
+        )
+        memory_load = sum(sample.memory_load for sample in bucket_samples) / len(
+            bucket_samples
+        )
+        rows.append(
+            {
+                "timestamp": datetime.fromtimestamp(bucket * period),
+                "cpu_load": int(cpu_load),
+                "memory_load": int(memory_load),
+                "average_load": int((cpu_load + memory_load) / 2),
+                "loop_lag_ms": int(
+                    max(sample.loop_lag_ms for sample in bucket_samples)
+                ),
+                "rss_bytes": max(sample.rss_bytes for sample in bucket_samples),
+                "db_connections": max(
+                    sample.db_connections for sample in bucket_samples
+                ),
+                "redis_connections": max(
+                    sample.redis_connections for sample in bucket_samples
+                ),
+            }
+        )
+    return rows
+
+
+metrics_sampler = MetricsSampler()
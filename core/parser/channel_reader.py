@@ -0,0 +1,152 @@
+import logging
+from typing import Awaitable, Callable, List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import Channel
+from config.settings import BOT_NAME
+from core.redis_client import redis
+from core.telethon_client import telethon_client
+
+logger = logging.getLogger(BOT_NAME)
+
+# Hash channel name -> id последнего обработанного сообщения. Postgres
+# (channels.last_message_id) служит запасным хранилищем после потери Redis.
+CHANNEL_LAST_MESSAGE_IDS_KEY = "channel_last_message_ids"
+
+# Обработчики событий Telethon выполняются параллельно, поэтому отметка
+# только растет: запись меньшего id ничего не меняет
+SET_IF_GREATER_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], ARGV[1])
+if current and tonumber(current) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+return 1
+"""
+
+set_if_greater_script = redis.register_script(SET_IF_GREATER_SCRIPT)
+
+
+async def get_last_message_id(channel_name: str) -> Optional[int]:
+    last_message_id = await redis.hget(CHANNEL_LAST_MESSAGE_IDS_KEY, channel_name)
+    if last_message_id is not None:
+        return int(last_message_id)
+
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(
+            select(Channel.last_message_id).filter_by(name=channel_name).limit(1)
+        )
+        last_message_id = result.scalar_one_or_none()
+
+    if last_message_id is not None:
+        await redis.hset(CHANNEL_LAST_MESSAGE_IDS_KEY, channel_name, last_message_id)
+        logger.debug(
+            "Последнее сообщение канала %s загружено из базы: %s",
+            channel_name,
+            last_message_id,
+        )
+
+    return last_message_id
+
+
+async def set_last_message_id(channel_name: str, last_message_id: int) -> None:
+    await set_if_greater_script(
+        keys=[CHANNEL_LAST_MESSAGE_IDS_KEY], args=[channel_name, last_message_id]
+    )
+
+    async with get_session() as session:
+        session: AsyncSession
+        try:
+            await session.execute(
+                update(Channel)
+                .where(Channel.name == channel_name)
+                .values(
+                    last_message_id=func.greatest(
+                        func.coalesce(Channel.last_message_id, 0), last_message_id
+                    )
+                )
+            )
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(
+                f"Ошибка при сохранении последнего сообщения канала {channel_name}: {str(e)}"
+            )
+
+
+async def fetch_new_messages(
+    channel_name: str, limit: int, min_id: Optional[int] = None
+) -> List:
+    if min_id is None:
+        min_id = await get_last_message_id(channel_name)
+
+    if min_id is None:
+        # Отметки еще нет (новый канал или первый запуск после миграции):
+        # берем только последние limit сообщений, а не всю историю канала
+        messages = [
+            message
+            async for message in telethon_client.iter_messages(
+                channel_name, limit=limit
+            )
+        ]
+        messages.reverse()
+    else:
+        # reverse=True отдает сообщения от старых к новым сразу после min_id:
+        # если новых сообщений больше limit, остальные придут следующей
+        # страницей, а не будут пропущены
+        messages = [
+            message
+            async for message in telethon_client.iter_messages(
+                channel_name, limit=limit, min_id=min_id, reverse=True
+            )
+        ]
+
+    logger.debug(
+        "Канал %s: получено %s новых сообщений после %s.",
+        channel_name,
+        len(messages),
+        min_id,
+    )
+    return messages
+
+
+async def process_new_messages(
+    channel_name: str,
+    limit: int,
+    handler: Callable[[str, object], Awaitable[None]],
+) -> int:
+    # Отметка сдвигается только до последнего успешно обработанного
+    # сообщения: если обработка упала или процесс остановился посреди
+    # страницы, следующий проход начнет с первого необработанного
+    processed = 0
+    min_id = await get_last_message_id(channel_name)
+
+    while True:
+        messages = await fetch_new_messages(channel_name, limit, min_id)
+        last_processed_id = None
+        failed = False
+
+        for message in messages:
+            try:
+                await handler(channel_name, message)
+            except Exception as e:
+                logger.error(
+                    f"Ошибка при обработке сообщения {message.id} "
+                    f"канала {channel_name}: {str(e)}"
+                )
+                failed = True
+                break
+            last_processed_id = message.id
+            processed += 1
+
+        if last_processed_id is not None:
+            await set_last_message_id(channel_name, last_processed_id)
+
+        # Без отметки прочитаны самые новые сообщения: листать дальше некуда
+        if failed or min_id is None or len(messages) < limit:
+            return processed
+
+        min_id = messages[-1].id
@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import re
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+from config.settings import BOT_NAME
+from core.parser.utils import normalize_text
+from core.settings_cache import get_settings
+
+logger = logging.getLogger(BOT_NAME)
+
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+SHINGLE_SIZE = 4
+# Текст короче этого (после очистки) слишком беден признаками: у всех
+# постов без подписи был бы один и тот же отпечаток
+MIN_TEXT_LENGTH = 20
+
+# Ссылки, упоминания и хэштеги - то, что репосты чаще всего дописывают
+# к исходному тексту. Подпись перед ссылкой ("Источник: @channel")
+# убирается вместе с ней.
+NOISE_PATTERN = re.compile(
+    r"(?:\w+\s*:\s*)?(?:https?://\S+|www\.\S+|t\.me/\S+|[@#]\w+)"
+)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _feature_hash(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def clean_text(text: str) -> str:
+    text = NOISE_PATTERN.sub(" ", normalize_text(text or ""))
+    return " ".join(WORD_PATTERN.findall(text))
+
+
+def simhash(text: str) -> int:
+    weights = [0] * FINGERPRINT_BITS
+    text = clean_text(text)
+
+    # Признаки - символьные шинглы: на коротких постах они устойчивее слов
+    features = Counter(
+        text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))
+    )
+
+    for feature, weight in features.items():
+        feature_hash = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if feature_hash >> bit & 1:
+                weights[bit] += weight
+            else:
+                weights[bit] -= weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _bands(fingerprint: int) -> Iterable[Tuple[int, int]]:
+    for band in range(BANDS):
+        yield band, fingerprint >> (band * BAND_BITS) & BAND_MASK
+
+
+class DuplicateDetector:
+    # Кольцевой буфер отпечатков фиксированного размера. Отпечатки с
+    # расстоянием Хэмминга <= BANDS - 1 обязательно совпадают хотя бы в одной
+    # полосе, поэтому кандидатов ищем только по полосам, а не перебором.
+    # Без ttl отпечатки живут post_cache_duration, как и кэш постов.
+    def __init__(
+        self, capacity: int = 50_000, ttl: Optional[int] = None, max_distance: int = 3
+    ):
+        self.capacity = capacity
+        self._ttl = ttl
+        self.max_distance = min(max_distance, BANDS - 1)
+        self._fingerprints = array("Q", [0] * capacity)
+        self._timestamps = array("d", [0.0] * capacity)
+        self._bands: Dict[Tuple[int, int], Set[int]] = {}
+        self._head = 0
+        self._size = 0
+        self.checked: Counter = Counter()
+        self.duplicates: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ttl(self) -> int:
+        if self._ttl is not None:
+            return self._ttl
+        return get_settings().post_cache_duration
+
+    def _remove_slot(self, slot: int) -> None:
+        for band in _bands(self._fingerprints[slot]):
+            slots = self._bands.get(band)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del self._bands[band]
+
+    def _evict_expired(self, now: float) -> None:
+        expires_before = now - self.ttl
+        while self._size:
+            tail = (self._head - self._size) % self.capacity
+            if self._timestamps[tail] >= expires_before:
+                break
+            self._remove_slot(tail)
+            self._size -= 1
+
+    def _add(self, fingerprint: int, now: float) -> None:
+        slot = self._head
+        if self._size == self.capacity:
+            self._remove_slot(slot)
+        else:
+            self._size += 1
+
+        self._fingerprints[slot] = fingerprint
+        self._timestamps[slot] = now
+        for band in _bands(fingerprint):
+            self._bands.setdefault(band, set()).add(slot)
+        self._head = (slot + 1) % self.capacity
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        for band in _bands(fingerprint):
+            for slot in self._bands.get(band, ()):
+                candidate = self._fingerprints[slot]
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return candidate
+        return None
+
+    def is_duplicate(
+        self, channel: str, text: str, now: Optional[float] = None
+    ) -> bool:
+        now = time.time() if now is None else now
+        self._evict_expired(now)
+        self.checked[channel] += 1
+
+        text = clean_text(text)
+        if len(text) < MIN_TEXT_LENGTH:
+            return False
+
+        fingerprint = simhash(text)
+
+        if self.find(fingerprint) is not None:
+            self.duplicates[channel] += 1
+            logger.debug("Пост из канала %s отброшен как дубликат.", channel)
+            return True
+
+        self._add(fingerprint, now)
+        return False
+
+    def duplicate_rates(self) -> Dict[str, float]:
+        return {
+            channel: self.duplicates[channel] / checked
+            for channel, checked in self.checked.items()
+        }
+
+
+# Проверку должен вызывать core.parser.main перед сопоставлением поста;
+# в этом дереве его нет, поэтому детектор пока не подключен.
+duplicate_detector = DuplicateDetector()
@@ -0,0 +1,221 @@
+import asyncio
+import contextlib
+import logging
+import statistics
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+from telethon import events, utils
+from config.settings import BOT_NAME
+from core.telethon_client import telethon_client
+from core.parser.channel_reader import (
+    get_last_message_id,
+    process_new_messages,
+    set_last_message_id,
+)
+
+logger = logging.getLogger(BOT_NAME)
+
+INGESTION_MODE_POLLING = "polling"
+INGESTION_MODE_EVENTS = "events"
+# Как часто статистика задержки по режимам пишется в лог
+LATENCY_REPORT_INTERVAL = 300
+
+MessageHandler = Callable[[str, object], Awaitable[None]]
+
+
+class LatencyStats:
+    # Задержка от публикации поста до сопоставления, отдельно по режимам
+    def __init__(self, maxlen: int = 1000):
+        self._samples: Dict[str, deque] = {}
+        self.maxlen = maxlen
+
+    def record(self, mode: str, posted_at: datetime) -> float:
+        latency = (datetime.now(timezone.utc) - posted_at).total_seconds()
+        self._samples.setdefault(mode, deque(maxlen=self.maxlen)).append(latency)
+        return latency
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        for mode, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[mode] = {
+                "count": len(ordered),
+                "avg": round(statistics.fmean(ordered), 3),
+                "p50": round(ordered[len(ordered) // 2], 3),
+                "p95": round(ordered[int((len(ordered) - 1) * 0.95)], 3),
+                "max": round(ordered[-1], 3),
+            }
+        return result
+
+
+ingestion_latency = LatencyStats()
+
+
+_gap_fill_pending = True
+# Живые сообщения, пришедшие во время догрузки. Догрузка читает те же
+# сообщения, поэтому они обрабатываются после нее и только если лежат
+# дальше сохраненной отметки.
+_held_messages: List[Tuple[str, object]] = []
+
+
+async def _release_held_messages(handler: MessageHandler) -> None:
+    while _held_messages:
+        channel_name, message = _held_messages.pop(0)
+        last_message_id = await get_last_message_id(channel_name)
+        if last_message_id is not None and message.id <= last_message_id:
+            continue
+
+        try:
+            await handler(channel_name, message)
+        except Exception as e:
+            logger.error(
+                f"Ошибка при обработке сообщения {message.id} "
+                f"канала {channel_name}: {str(e)}"
+            )
+            continue
+        await set_last_message_id(channel_name, message.id)
+
+
+async def fill_gaps(
+    channel_names: Iterable[str], message_limit: int, handler: MessageHandler
+) -> None:
+    global _gap_fill_pending
+
+    for channel_name in channel_names:
+        try:
+            await process_new_messages(channel_name, message_limit, handler)
+        except Exception as e:
+            logger.error(f"Ошибка при догрузке канала {channel_name}: {str(e)}")
+
+    # Между опустевшей очередью и сбросом флага нет await, поэтому новое
+    # событие либо попадет в очередь, либо будет обработано сразу
+    await _release_held_messages(handler)
+    _gap_fill_pending = False
+
+
+async def register_channel_events(
+    channel_names: Iterable[str], handler: MessageHandler
+) -> None:
+    channels_by_peer_id: Dict[int, str] = {}
+
+    for channel_name in channel_names:
+        try:
+            entity = await telethon_client.get_entity(channel_name)
+        except Exception as e:
+            logger.error(f"Не удалось получить канал {channel_name}: {str(e)}")
+            continue
+        channels_by_peer_id[utils.get_peer_id(entity)] = channel_name
+
+    async def on_new_message(event: events.NewMessage.Event) -> None:
+        channel_name = channels_by_peer_id.get(event.chat_id)
+        if channel_name is None:
+            return
+
+        # Пока пропуск после переподключения не догружен, сообщение
+        # откладывается до конца догрузки: иначе оно было бы обработано
+        # дважды, а отметка ушла бы вперед пропущенных сообщений
+        if _gap_fill_pending:
+            _held_messages.append((channel_name, event.message))
+            return
+
+        await handler(channel_name, event.message)
+        # Отметка сдвигается после обработки
+        await set_last_message_id(channel_name, event.message.id)
+
+    telethon_client.add_event_handler(
+        on_new_message, events.NewMessage(chats=list(channels_by_peer_id))
+    )
+    logger.debug(
+        "Подписка на новые сообщения оформлена для %s каналов.",
+        len(channels_by_peer_id),
+    )
+
+
+async def watch_reconnects(
+    channel_names: Iterable[str],
+    message_limit: int,
+    handler: MessageHandler,
+    check_interval: int,
+) -> None:
+    global _gap_fill_pending
+
+    reconnected = asyncio.Event()
+
+    def on_reconnect() -> None:
+        global _gap_fill_pending
+
+        # Сообщения, пришедшие после переподключения, ждут догрузки
+        _gap_fill_pending = True
+        reconnected.set()
+
+    telethon_client.add_reconnect_callback(on_reconnect)
+    # Первая догрузка - за время, пока парсер не работал
+    reconnected.set()
+
+    while True:
+        if reconnected.is_set() and telethon_client.is_connected():
+            # Флаг ставится заново перед каждой догрузкой: переподключение
+            # во время догрузки запустит еще одну
+            _gap_fill_pending = True
+            reconnected.clear()
+            logger.debug("Telethon подключен, догружаем пропущенные сообщения.")
+            await fill_gaps(channel_names, message_limit, handler)
+            continue
+
+        # Запасной путь на случай, если соединение разорвано окончательно
+        # и Telethon подключают заново вручную
+        if not telethon_client.is_connected():
+            _gap_fill_pending = True
+            reconnected.set()
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(reconnected.wait(), check_interval)
+
+
+async def report_latency(interval: int = LATENCY_REPORT_INTERVAL) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        stats = ingestion_latency.stats()
+        if stats:
+            logger.info("Задержка обработки постов: %s", stats)
+
+
+# Запускать должен core.parser.main, которого в этом дереве нет; до
+# этого модуль не подключен.
+async def run_ingestion(
+    mode: str,
+    channel_names: Iterable[str],
+    message_limit: int,
+    handler: MessageHandler,
+    check_interval: int,
+) -> None:
+    channel_names = list(channel_names)
+    report_task = asyncio.create_task(report_latency())
+
+    async def handle_and_measure(channel_name: str, message) -> None:
+        await handler(channel_name, message)
+        latency = ingestion_latency.record(mode, message.date)
+        logger.debug(
+            "Пост %s из канала %s обработан через %.1f сек. (%s)",
+            message.id,
+            channel_name,
+            latency,
+            mode,
+        )
+
+    try:
+        if mode == INGESTION_MODE_EVENTS:
+            await register_channel_events(channel_names, handle_and_measure)
+            await watch_reconnects(
+                channel_names, message_limit, handle_and_measure, check_interval
+            )
+            return
+
+        while True:
+            await fill_gaps(channel_names, message_limit, handle_and_measure)
+            await asyncio.sleep(check_interval)
+    finally:
+        report_task.cancel()
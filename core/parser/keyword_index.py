@@ -0,0 +1,115 @@
+import logging
+from typing import Iterable, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import UserJobDirection
+from config.settings import BOT_NAME
+from core.redis_client import redis
+from core.parser.utils import normalize_text
+
+logger = logging.getLogger(BOT_NAME)
+
+# Обратный индекс: ключевое слово -> множество id записей UserJobDirection.
+# Отдельное множество хранит все проиндексированные слова, чтобы
+# перестроение не требовало SCAN по всему keyspace.
+KEYWORD_INDEX_KEYWORDS_KEY = "keyword_index:keywords"
+
+
+def get_keyword_index_key(keyword: str) -> str:
+    return f"keyword_index:{keyword}"
+
+
+def _normalize_keywords(keywords: Iterable[str]) -> Set[str]:
+    return {normalize_text(keyword.strip()) for keyword in keywords if keyword.strip()}
+
+
+async def add_direction_keywords(
+    user_direction_id: int, keywords: Iterable[str]
+) -> None:
+    keywords = _normalize_keywords(keywords)
+    if not keywords:
+        return
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for keyword in keywords:
+            pipe.sadd(get_keyword_index_key(keyword), user_direction_id)
+        pipe.sadd(KEYWORD_INDEX_KEYWORDS_KEY, *keywords)
+        await pipe.execute()
+
+    logger.debug(
+        "Направление %s добавлено в индекс по %s ключевым словам.",
+        user_direction_id,
+        len(keywords),
+    )
+
+
+async def remove_direction_keywords(
+    user_direction_id: int, keywords: Iterable[str]
+) -> None:
+    keywords = _normalize_keywords(keywords)
+    if not keywords:
+        return
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for keyword in keywords:
+            pipe.srem(get_keyword_index_key(keyword), user_direction_id)
+        await pipe.execute()
+
+    logger.debug(
+        "Направление %s удалено из индекса по %s ключевым словам.",
+        user_direction_id,
+        len(keywords),
+    )
+
+
+async def replace_direction_keywords(
+    user_direction_id: int, old_keywords: Iterable[str], new_keywords: Iterable[str]
+) -> None:
+    old_keywords = _normalize_keywords(old_keywords)
+    new_keywords = _normalize_keywords(new_keywords)
+
+    await remove_direction_keywords(user_direction_id, old_keywords - new_keywords)
+    await add_direction_keywords(user_direction_id, new_keywords - old_keywords)
+
+
+# Предназначено для core.parser.main, которого в этом дереве нет; пока
+# функцию никто не вызывает.
+async def get_keyword_subscribers(keywords: Iterable[str]) -> Set[int]:
+    keys = [get_keyword_index_key(keyword) for keyword in _normalize_keywords(keywords)]
+    if not keys:
+        return set()
+
+    members = await redis.sunion(keys)
+    return {int(member) for member in members}
+
+
+async def rebuild_keyword_index() -> int:
+    index: dict = {}
+
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(
+            select(UserJobDirection.id, UserJobDirection.selected_keywords)
+        )
+
+        for user_direction_id, selected_keywords in result.all():
+            if not selected_keywords:
+                continue
+            for keyword in _normalize_keywords(selected_keywords.split("\n")):
+                index.setdefault(keyword, set()).add(user_direction_id)
+
+    old_keywords = await redis.smembers(KEYWORD_INDEX_KEYWORDS_KEY)
+
+    async with redis.pipeline(transaction=True) as pipe:
+        for keyword in old_keywords:
+            pipe.delete(get_keyword_index_key(keyword))
+        pipe.delete(KEYWORD_INDEX_KEYWORDS_KEY)
+        for keyword, user_direction_ids in index.items():
+            pipe.sadd(get_keyword_index_key(keyword), *user_direction_ids)
+        if index:
+            pipe.sadd(KEYWORD_INDEX_KEYWORDS_KEY, *index.keys())
+        await pipe.execute()
+
+    logger.debug("Индекс ключевых слов перестроен: %s ключевых слов.", len(index))
+    return len(index)
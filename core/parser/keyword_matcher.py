@@ -0,0 +1,194 @@
+import logging
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import UserJobDirection
+from config.settings import BOT_NAME
+from core.redis_client import redis
+from core.parser.synonyms import get_synonyms
+from core.parser.utils import normalize_text
+
+logger = logging.getLogger(BOT_NAME)
+
+KEYWORD_MATCHER_VERSION_KEY = "keyword_matcher:version"
+
+
+class KeywordMatcher:
+    # Автомат Ахо-Корасик: один проход по тексту поста находит все ключевые
+    # слова сразу, вместо перебора ключевых слов каждого пользователя.
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+        self.patterns: List[str] = []
+        self.payloads: List[Set[int]] = []
+        self.build_time = 0.0
+        self.memory_bytes = 0
+
+    @classmethod
+    def build(cls, keywords: Dict[str, Iterable[int]]) -> "KeywordMatcher":
+        started_at = time.perf_counter()
+        matcher = cls()
+        pattern_ids: Dict[str, int] = {}
+        outputs: List[List[int]] = [[]]
+
+        for keyword, payload in keywords.items():
+            pattern = normalize_text(keyword.strip())
+            if not pattern:
+                continue
+
+            if pattern in pattern_ids:
+                matcher.payloads[pattern_ids[pattern]].update(payload)
+                continue
+
+            state = 0
+            for char in pattern:
+                next_state = matcher.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(matcher.goto)
+                    matcher.goto[state][char] = next_state
+                    matcher.goto.append({})
+                    outputs.append([])
+                state = next_state
+
+            pattern_ids[pattern] = len(matcher.patterns)
+            outputs[state].append(len(matcher.patterns))
+            matcher.patterns.append(pattern)
+            matcher.payloads.append(set(payload))
+
+        matcher.fail = [0] * len(matcher.goto)
+        queue = deque(matcher.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in matcher.goto[state].items():
+                queue.append(next_state)
+                fallback = matcher.fail[state]
+                while fallback and char not in matcher.goto[fallback]:
+                    fallback = matcher.fail[fallback]
+                matcher.fail[next_state] = matcher.goto[fallback].get(char, 0)
+                outputs[next_state].extend(outputs[matcher.fail[next_state]])
+
+        matcher.output = [tuple(output) for output in outputs]
+        matcher.build_time = time.perf_counter() - started_at
+        matcher.memory_bytes = matcher._estimate_memory()
+        return matcher
+
+    def _estimate_memory(self) -> int:
+        size = sum(
+            sys.getsizeof(container)
+            for container in (
+                self.goto,
+                self.fail,
+                self.output,
+                self.patterns,
+                self.payloads,
+            )
+        )
+        size += sum(sys.getsizeof(transitions) for transitions in self.goto)
+        size += sum(sys.getsizeof(output) for output in self.output)
+        size += sum(sys.getsizeof(pattern) for pattern in self.patterns)
+        size += sum(sys.getsizeof(payload) for payload in self.payloads)
+        return size
+
+    def find_keywords(self, text: str, whole_words: bool = True) -> Set[int]:
+        text = normalize_text(text)
+        found: Set[int] = set()
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            for pattern_id in self.output[state]:
+                if whole_words:
+                    before = position - len(self.patterns[pattern_id])
+                    after = position + 1
+                    if before >= 0 and text[before].isalnum():
+                        continue
+                    if after < len(text) and text[after].isalnum():
+                        continue
+                found.add(pattern_id)
+
+        return found
+
+    def match(self, text: str, whole_words: bool = True) -> Set[int]:
+        matched: Set[int] = set()
+        for pattern_id in self.find_keywords(text, whole_words):
+            matched.update(self.payloads[pattern_id])
+        return matched
+
+    def match_keywords(
+        self, text: str, whole_words: bool = True
+    ) -> Dict[str, Set[int]]:
+        return {
+            self.patterns[pattern_id]: self.payloads[pattern_id]
+            for pattern_id in self.find_keywords(text, whole_words)
+        }
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "patterns": len(self.patterns),
+            "states": len(self.goto),
+            "build_time_ms": round(self.build_time * 1000, 3),
+            "memory_bytes": self.memory_bytes,
+        }
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_version: Optional[str] = None
+
+
+async def load_keyword_payloads() -> Dict[str, Set[int]]:
+    keywords: Dict[str, Set[int]] = {}
+
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(
+            select(UserJobDirection.id, UserJobDirection.selected_keywords)
+        )
+
+        for user_direction_id, selected_keywords in result.all():
+            if not selected_keywords:
+                continue
+            for keyword in selected_keywords.split("\n"):
+                keyword = normalize_text(keyword.strip())
+                if keyword:
+                    keywords.setdefault(keyword, set()).add(user_direction_id)
+
+    # Синонимы берутся из заранее рассчитанной таблицы и получают те же
+    # направления, что и исходное ключевое слово
+    synonyms = await get_synonyms(keywords.keys())
+    for keyword, keyword_synonyms in synonyms.items():
+        for synonym in keyword_synonyms:
+            keywords.setdefault(synonym, set()).update(keywords[keyword])
+
+    return keywords
+
+
+# Точка входа для core.parser.main; сам цикл парсера в этом дереве отсутствует,
+# поэтому горячий путь пока автомат не использует.
+async def get_keyword_matcher() -> KeywordMatcher:
+    global _matcher, _matcher_version
+
+    version = await redis.get(KEYWORD_MATCHER_VERSION_KEY) or "0"
+
+    if _matcher is None or version != _matcher_version:
+        _matcher = KeywordMatcher.build(await load_keyword_payloads())
+        _matcher_version = version
+        logger.debug(
+            "Автомат ключевых слов перестроен (версия %s): %s", version, _matcher.stats
+        )
+
+    return _matcher
+
+
+async def invalidate_keyword_matcher() -> None:
+    await redis.incr(KEYWORD_MATCHER_VERSION_KEY)
+    logger.debug("Автомат ключевых слов помечен для перестроения.")
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from config.settings import (
+    BOT_NAME,
+    LEMMA_CACHE_PATH,
+    LEMMA_CACHE_SIZE,
+    NLP_BATCH_SIZE,
+)
+
+logger = logging.getLogger(BOT_NAME)
+
+SPACY_MODEL = "ru_core_news_sm"
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[-']\w+)*")
+
+
+class LemmaCache:
+    # LRU-кэш token -> lemma: лексика заказов повторяется, поэтому
+    # большинство токенов не доходит до модели spaCy.
+    def __init__(
+        self,
+        maxsize: int = LEMMA_CACHE_SIZE,
+        path: Optional[str] = None,
+        track_new: bool = False,
+    ):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lemmas: "OrderedDict[str, str]" = OrderedDict()
+        # Новые леммы, еще не переданные в кэш основного процесса
+        self._new_lemmas: Optional[Dict[str, str]] = {} if track_new else None
+
+    def __len__(self) -> int:
+        return len(self._lemmas)
+
+    def get(self, token: str) -> Optional[str]:
+        lemma = self._lemmas.get(token)
+        if lemma is None:
+            self.misses += 1
+            return None
+
+        self._lemmas.move_to_end(token)
+        self.hits += 1
+        return lemma
+
+    def set(self, token: str, lemma: str) -> None:
+        self._lemmas[token] = lemma
+        self._lemmas.move_to_end(token)
+        if len(self._lemmas) > self.maxsize:
+            self._lemmas.popitem(last=False)
+        if self._new_lemmas is not None:
+            self._new_lemmas[token] = lemma
+
+    def drain_new(self) -> Dict[str, str]:
+        new_lemmas = self._new_lemmas or {}
+        if self._new_lemmas is not None:
+            self._new_lemmas = {}
+        return new_lemmas
+
+    def clear(self) -> None:
+        self._lemmas.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self._lemmas),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                lemmas: Dict[str, str] = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Ошибка при загрузке кэша лемм: {str(e)}")
+            return
+
+        for token, lemma in lemmas.items():
+            self.set(token, lemma)
+        logger.debug("Кэш лемм загружен с диска: %s записей.", len(self._lemmas))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+
+        try:
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(self._lemmas, file, ensure_ascii=False)
+        except OSError as e:
+            logger.error(f"Ошибка при сохранении кэша лемм: {str(e)}")
+            return
+        logger.debug("Кэш лемм сохранен на диск: %s записей.", len(self._lemmas))
+
+
+class Lemmatizer:
+    def __init__(self, cache: Optional[LemmaCache] = None, model: str = SPACY_MODEL):
+        self.cache = cache
+        self.model = model
+        self._nlp = None
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            import spacy
+
+            # Для лемм нужны только морфология и лемматизатор
+            self._nlp = spacy.load(self.model, exclude=["parser", "ner"])
+        return self._nlp
+
+    def tokenize(self, text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def lemmatize_tokens(self, tokens: Iterable[str]) -> List[str]:
+        tokens = list(tokens)
+        if self.cache is None:
+            return [
+                doc[0].lemma_ if len(doc) else token
+                for token, doc in zip(tokens, self._pipe(tokens))
+            ]
+
+        lemmas: Dict[str, Optional[str]] = {}
+        missing = []
+        for token in tokens:
+            if token in lemmas:
+                continue
+            lemmas[token] = self.cache.get(token)
+            if lemmas[token] is None:
+                missing.append(token)
+
+        for token, doc in zip(missing, self._pipe(missing)):
+            lemma = doc[0].lemma_ if len(doc) else token
+            lemmas[token] = lemma
+            self.cache.set(token, lemma)
+
+        return [lemmas[token] for token in tokens]
+
+    def lemmatize(self, text: str) -> List[str]:
+        return self.lemmatize_tokens(self.tokenize(text))
+
+    def lemmatize_many(self, texts: Iterable[str]) -> List[List[str]]:
+        # Токены всех постов пакета проходят через один вызов nlp.pipe,
+        # после чего результат раскладывается обратно по постам
+        posts_tokens = [self.tokenize(text) for text in texts]
+        lemmas = self.lemmatize_tokens(
+            token for tokens in posts_tokens for token in tokens
+        )
+
+        results = []
+        offset = 0
+        for tokens in posts_tokens:
+            results.append(lemmas[offset : offset + len(tokens)])
+            offset += len(tokens)
+        return results
+
+    def _pipe(self, tokens: List[str]):
+        if not tokens:
+            return iter(())
+        return self.nlp.pipe(tokens, batch_size=NLP_BATCH_SIZE)
+
+
+lemma_cache = LemmaCache(path=LEMMA_CACHE_PATH)
+lemmatizer = Lemmatizer(cache=lemma_cache)
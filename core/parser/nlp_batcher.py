@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+from config.settings import BOT_NAME, NLP_BATCH_SIZE, NLP_BATCH_WAIT
+from core.parser.nlp_pool import NLPExecutor, nlp_executor
+
+logger = logging.getLogger(BOT_NAME)
+
+
+class NLPBatcher:
+    # Собирает посты со всех каналов в микропакеты: пакет отправляется,
+    # когда набралось max_size постов или прошло max_wait секунд.
+    def __init__(
+        self,
+        executor: NLPExecutor = nlp_executor,
+        max_size: int = NLP_BATCH_SIZE,
+        max_wait: float = NLP_BATCH_WAIT,
+    ):
+        self.executor = executor
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        # Все еще не выполненные запросы: в очереди, в собираемом пакете и
+        # в пакетах, отправленных в пул
+        self._pending: Set[asyncio.Future] = set()
+
+    async def lemmatize(self, text: str) -> List[str]:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Пакеты обрабатываются параллельно, пока в пуле есть свободные процессы
+            task = asyncio.create_task(self._process(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _process(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+
+        try:
+            results = await self.executor.lemmatize(texts)
+        except Exception as e:
+            logger.error(f"Ошибка при лемматизации пакета постов: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), lemmas in zip(batch, results):
+            if not future.done():
+                future.set_result(lemmas)
+
+    async def stop(self) -> None:
+        tasks = list(self._batches)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+        # Иначе вызывающие lemmatize ждали бы результата вечно
+        error = RuntimeError("Лемматизация остановлена.")
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(error)
+
+
+# app.parser только останавливает батчер; лемматизацию постов через него
+# должен вызывать core.parser.main, которого в этом дереве нет.
+nlp_batcher = NLPBatcher()
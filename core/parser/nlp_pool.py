@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from config.settings import BOT_NAME, NLP_WORKERS
+from core.parser.lemmatizer import LemmaCache, Lemmatizer, lemmatizer
+
+logger = logging.getLogger(BOT_NAME)
+
+_worker_lemmatizer: Optional[Lemmatizer] = None
+
+
+def _init_worker() -> None:
+    global _worker_lemmatizer
+
+    # Кэш процесса на диск не пишется: новые леммы возвращаются вместе с
+    # результатом и сохраняются кэшем основного процесса
+    cache = LemmaCache(path=lemmatizer.cache.path, track_new=True)
+    cache.load()
+    cache.path = None
+    cache.drain_new()
+    # Модель загружается один раз при старте процесса, а не на первом посте
+    _worker_lemmatizer = Lemmatizer(cache=cache)
+    _worker_lemmatizer.nlp
+
+
+def _lemmatize_batch(texts: List[str]) -> Tuple[List[List[str]], Dict[str, str]]:
+    if _worker_lemmatizer is None:
+        return lemmatizer.lemmatize_many(texts), {}
+    return (
+        _worker_lemmatizer.lemmatize_many(texts),
+        _worker_lemmatizer.cache.drain_new(),
+    )
+
+
+class NLPExecutor:
+    # Лемматизация выполняется вне цикла событий бота: в пуле процессов,
+    # если NLP_WORKERS > 0, иначе в отдельном потоке.
+    def __init__(self, workers: int = NLP_WORKERS):
+        self.workers = workers
+        self.queue_depth = 0
+        self.batches = 0
+        self.last_batch_latency = 0.0
+        self.total_batch_latency = 0.0
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+            # Прогреваем все процессы, чтобы первые посты не ждали загрузку модели
+            for _ in range(self.workers):
+                self._executor.submit(_lemmatize_batch, [])
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        logger.debug("Пул NLP запущен: %s процессов.", self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        logger.debug("Пул NLP остановлен.")
+
+    async def lemmatize(self, texts: List[str]) -> List[List[str]]:
+        if not texts:
+            return []
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        started_at = time.perf_counter()
+        self.queue_depth += 1
+
+        try:
+            results, new_lemmas = await loop.run_in_executor(
+                self._executor, _lemmatize_batch, texts
+            )
+        finally:
+            self.queue_depth -= 1
+            self.batches += 1
+            self.last_batch_latency = time.perf_counter() - started_at
+            self.total_batch_latency += self.last_batch_latency
+            logger.debug(
+                "Пакет из %s постов лемматизирован за %.1f мс, в очереди %s.",
+                len(texts),
+                self.last_batch_latency * 1000,
+                self.queue_depth,
+            )
+
+        for token, lemma in new_lemmas.items():
+            lemmatizer.cache.set(token, lemma)
+        return results
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "last_batch_latency_ms": round(self.last_batch_latency * 1000, 3),
+            "avg_batch_latency_ms": (
+                round(self.total_batch_latency / self.batches * 1000, 3)
+                if self.batches
+                else 0.0
+            ),
+        }
+
+
+nlp_executor = NLPExecutor()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import JobDirection, UserJobDirection
+from config.settings import BOT_NAME
+from core.redis_client import redis
+from core.parser.utils import normalize_text
+
+logger = logging.getLogger(BOT_NAME)
+
+# Таблица синонимов: hash keyword -> JSON-список синонимов. Заполняется
+# заранее, чтобы в горячем пути не обращаться к ruwordnet.
+SYNONYMS_KEY = "synonyms"
+SYNONYMS_STALE_KEY = "synonyms:stale"
+SYNONYMS_MAX_KEY = "synonyms:max_synonyms"
+
+
+def expand_keywords(keywords: Iterable[str], max_synonyms: int) -> Dict[str, List[str]]:
+    from ruwordnet import RuWordNet
+
+    wordnet = RuWordNet()
+    expanded = {}
+
+    for keyword in keywords:
+        synonyms = []
+        for synset in wordnet.get_synsets(keyword):
+            for sense in synset.senses:
+                synonym = normalize_text(sense.name)
+                if synonym != keyword and synonym not in synonyms:
+                    synonyms.append(synonym)
+        expanded[keyword] = synonyms[:max_synonyms]
+
+    return expanded
+
+
+async def load_all_keywords() -> Set[str]:
+    keywords: Set[str] = set()
+
+    async with get_session() as session:
+        session: AsyncSession
+        recommended = await session.execute(select(JobDirection.recommended_keywords))
+        selected = await session.execute(select(UserJobDirection.selected_keywords))
+
+        for value in [*recommended.scalars().all(), *selected.scalars().all()]:
+            if not value:
+                continue
+            keywords.update(
+                normalize_text(keyword.strip())
+                for keyword in value.split("\n")
+                if keyword.strip()
+            )
+
+    return keywords
+
+
+async def precompute_synonyms(max_synonyms: int) -> int:
+    # Флаг снимается до расчета: отметка, пришедшая во время расчета,
+    # сохранится и запустит следующий пересчет
+    await redis.delete(SYNONYMS_STALE_KEY)
+    try:
+        return await _precompute_synonyms(max_synonyms)
+    except Exception:
+        await mark_synonyms_stale()
+        raise
+
+
+async def _precompute_synonyms(max_synonyms: int) -> int:
+    keywords = await load_all_keywords()
+
+    cached_max_synonyms = await redis.get(SYNONYMS_MAX_KEY)
+    if cached_max_synonyms != str(max_synonyms):
+        await redis.delete(SYNONYMS_KEY)
+        await redis.set(SYNONYMS_MAX_KEY, max_synonyms)
+
+    known_keywords = set(await redis.hkeys(SYNONYMS_KEY))
+    missing_keywords = keywords - known_keywords
+    unused_keywords = known_keywords - keywords
+
+    if missing_keywords:
+        # ruwordnet синхронный, поэтому не блокируем цикл событий
+        expanded = await asyncio.to_thread(
+            expand_keywords, sorted(missing_keywords), max_synonyms
+        )
+        await redis.hset(
+            SYNONYMS_KEY,
+            mapping={
+                keyword: json.dumps(synonyms, ensure_ascii=False)
+                for keyword, synonyms in expanded.items()
+            },
+        )
+
+    if unused_keywords:
+        await redis.hdel(SYNONYMS_KEY, *unused_keywords)
+
+    logger.debug(
+        "Таблица синонимов обновлена: добавлено %s, удалено %s, всего %s ключевых слов.",
+        len(missing_keywords),
+        len(unused_keywords),
+        len(keywords),
+    )
+    return len(missing_keywords) + len(unused_keywords)
+
+
+async def get_synonyms(keywords: Iterable[str]) -> Dict[str, List[str]]:
+    keywords = list(keywords)
+    if not keywords:
+        return {}
+
+    values = await redis.hmget(SYNONYMS_KEY, keywords)
+    return {
+        keyword: json.loads(value) if value else []
+        for keyword, value in zip(keywords, values)
+    }
+
+
+async def is_synonyms_stale() -> bool:
+    return bool(await redis.exists(SYNONYMS_STALE_KEY))
+
+
+async def mark_synonyms_stale() -> None:
+    await redis.set(SYNONYMS_STALE_KEY, "1")
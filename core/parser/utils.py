@@ -0,0 +1,2 @@
+def normalize_text(text: str) -> str:
+    return text.lower().replace("ё", "е")
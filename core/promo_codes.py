@@ -0,0 +1,264 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import PromoCode, PromoCodeUsage, User
+from config.settings import BOT_NAME
+from core.redis_client import redis
+from core.cache_loader import (
+    LOCK_POLL_INTERVAL,
+    LOCK_TIMEOUT,
+    RELEASE_LOCK_SCRIPT,
+    single_flight,
+)
+
+logger = logging.getLogger(BOT_NAME)
+
+RESERVED = "reserved"
+REDEEMED = "redeemed"
+ALREADY_USED = "already_used"
+EXHAUSTED = "exhausted"
+
+# Множество Telegram id пользователей, использовавших промокод, и флаг
+# того, что множество заполнено из базы. Ключи живут без TTL: иначе
+# резерв, еще не записанный в базу, мог бы потеряться при перезагрузке.
+REDEMPTIONS_KEY = "promo_code:{promo_code_id}:redemptions"
+REDEMPTIONS_LOADED_KEY = "promo_code:{promo_code_id}:redemptions_loaded"
+# Sorted set резервов, еще не записанных в базу: участник - Telegram id,
+# score - время резерва. Резерв процесса, упавшего до записи в базу,
+# снимается сверкой с promo_code_usage через RESERVATION_TIMEOUT секунд.
+REDEMPTIONS_PENDING_KEY = "promo_code:{promo_code_id}:redemptions_pending"
+RESERVATION_TIMEOUT = 300
+
+# Проверка лимита, повторного использования и резерв - одна атомарная
+# операция. -2 означает, что множество еще не загружено из базы.
+RESERVE_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 0 then
+    return -2
+end
+if redis.call("SISMEMBER", KEYS[1], ARGV[1]) == 1 then
+    return 0
+end
+if redis.call("SCARD", KEYS[1]) >= tonumber(ARGV[2]) then
+    return -1
+end
+redis.call("SADD", KEYS[1], ARGV[1])
+redis.call("ZADD", KEYS[3], ARGV[3], ARGV[1])
+return 1
+"""
+
+# Снимает зависшие резервы. Резерв, обновленный после сверки (снятый и
+# взятый заново), не трогаем.
+RELEASE_STALE_SCRIPT = """
+local released = 0
+for i = 2, #ARGV do
+    local reserved_at = redis.call("ZSCORE", KEYS[3], ARGV[i])
+    if reserved_at and tonumber(reserved_at) <= tonumber(ARGV[1]) then
+        redis.call("ZREM", KEYS[3], ARGV[i])
+        redis.call("SREM", KEYS[1], ARGV[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+# Заполняет множество, только если его еще никто не заполнил
+LOAD_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    return 0
+end
+if #ARGV > 0 then
+    redis.call("SADD", KEYS[1], unpack(ARGV))
+end
+redis.call("SET", KEYS[2], "1")
+return 1
+"""
+
+reserve_script = redis.register_script(RESERVE_SCRIPT)
+load_script = redis.register_script(LOAD_SCRIPT)
+release_stale_script = redis.register_script(RELEASE_STALE_SCRIPT)
+
+
+def get_redemption_keys(promo_code_id: int) -> list:
+    return [
+        REDEMPTIONS_KEY.format(promo_code_id=promo_code_id),
+        REDEMPTIONS_LOADED_KEY.format(promo_code_id=promo_code_id),
+        REDEMPTIONS_PENDING_KEY.format(promo_code_id=promo_code_id),
+    ]
+
+
+async def load_redemptions(promo_code_id: int) -> None:
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(
+            select(User.user_id)
+            .join(PromoCodeUsage, PromoCodeUsage.user_id == User.id)
+            .filter(PromoCodeUsage.promo_code_id == promo_code_id)
+        )
+        user_ids = [str(user_id) for user_id in result.scalars().all()]
+
+    await load_script(keys=get_redemption_keys(promo_code_id), args=user_ids)
+    logger.debug(
+        "Использования промокода %s загружены из базы: %s.",
+        promo_code_id,
+        len(user_ids),
+    )
+
+
+async def _seed_redemptions(promo_code_id: int) -> None:
+    # Множество загружает из базы один процесс; остальные ждут флага
+    # загрузки, а не выполняют тот же запрос сами
+    loaded_key = get_redemption_keys(promo_code_id)[1]
+    lock_key = f"{loaded_key}:lock"
+    token = uuid.uuid4().hex
+
+    while not await redis.set(lock_key, token, nx=True, ex=LOCK_TIMEOUT):
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        if await redis.exists(loaded_key):
+            return
+
+    try:
+        if not await redis.exists(loaded_key):
+            await load_redemptions(promo_code_id)
+    finally:
+        await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+
+async def seed_redemptions(promo_code_id: int) -> None:
+    loaded_key = get_redemption_keys(promo_code_id)[1]
+    await asyncio.shield(
+        single_flight(loaded_key, lambda: _seed_redemptions(promo_code_id))
+    )
+
+
+async def _reconcile_reservations(promo_code_id: int) -> int:
+    keys = get_redemption_keys(promo_code_id)
+    cutoff = time.time() - RESERVATION_TIMEOUT
+    stale = await redis.zrangebyscore(keys[2], "-inf", cutoff)
+    if not stale:
+        return 0
+
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(
+            select(User.user_id)
+            .join(PromoCodeUsage, PromoCodeUsage.user_id == User.id)
+            .filter(
+                PromoCodeUsage.promo_code_id == promo_code_id,
+                User.user_id.in_([int(user_id) for user_id in stale]),
+            )
+        )
+        committed = {str(user_id) for user_id in result.scalars().all()}
+
+    if committed:
+        await redis.zrem(keys[2], *committed)
+
+    lost = [user_id for user_id in stale if user_id not in committed]
+    released = 0
+    if lost:
+        released = await release_stale_script(keys=keys, args=[cutoff, *lost])
+        logger.debug(
+            "Сняты зависшие резервы промокода %s: %s.", promo_code_id, released
+        )
+    return released
+
+
+async def reconcile_reservations(promo_code_id: int) -> int:
+    pending_key = get_redemption_keys(promo_code_id)[2]
+    return await asyncio.shield(
+        single_flight(pending_key, lambda: _reconcile_reservations(promo_code_id))
+    )
+
+
+async def get_redemption_count(promo_code_id: int) -> int:
+    redemptions_key, loaded_key, _ = get_redemption_keys(promo_code_id)
+    if not await redis.exists(loaded_key):
+        await seed_redemptions(promo_code_id)
+    return await redis.scard(redemptions_key)
+
+
+async def reserve_promo_code(promo_code_id: int, user_id: int, max_uses: int) -> str:
+    reconciled = False
+    while True:
+        result = await reserve_script(
+            keys=get_redemption_keys(promo_code_id),
+            args=[user_id, max_uses, time.time()],
+        )
+        if result == -2:
+            await seed_redemptions(promo_code_id)
+            continue
+        # Отказ мог быть вызван резервом, который так и не дошел до базы
+        if result in (0, -1) and not reconciled:
+            reconciled = True
+            if await reconcile_reservations(promo_code_id):
+                continue
+        return {1: RESERVED, 0: ALREADY_USED, -1: EXHAUSTED}[result]
+
+
+async def confirm_promo_code(promo_code_id: int, user_id: int) -> None:
+    await redis.zrem(get_redemption_keys(promo_code_id)[2], user_id)
+
+
+async def release_promo_code(promo_code_id: int, user_id: int) -> None:
+    redemptions_key, _, pending_key = get_redemption_keys(promo_code_id)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.srem(redemptions_key, user_id)
+        pipe.zrem(pending_key, user_id)
+        await pipe.execute()
+
+
+async def redeem_promo_code(promo_code: PromoCode, user_id: int) -> str:
+    # Сначала резерв в Redis, затем запись в базу. Уникальный индекс
+    # promo_code_usage(user_id, promo_code_id) страхует от повторного
+    # использования, если Redis был очищен.
+    result = await reserve_promo_code(promo_code.id, user_id, promo_code.max_uses)
+    if result != RESERVED:
+        return result
+
+    try:
+        async with get_session() as session:
+            session: AsyncSession
+            internal_user_id = await session.scalar(
+                select(User.id).filter_by(user_id=user_id).limit(1)
+            )
+            if internal_user_id is None:
+                raise ValueError(f"Пользователь {user_id} не найден в базе.")
+
+            if promo_code.promo_type == "subscription":
+                subscription_duration = timedelta(seconds=int(promo_code.value))
+                await session.execute(
+                    update(User)
+                    .filter_by(id=internal_user_id)
+                    .values(
+                        subscription_end=func.coalesce(
+                            User.subscription_end, datetime.now()
+                        )
+                        + subscription_duration
+                    )
+                )
+
+            session.add(
+                PromoCodeUsage(user_id=internal_user_id, promo_code_id=promo_code.id)
+            )
+            await session.commit()
+    except IntegrityError:
+        # Использование уже есть в базе, значит резерв верен
+        await confirm_promo_code(promo_code.id, user_id)
+        logger.debug(
+            "Повторное использование промокода %s пользователем %s отклонено базой.",
+            promo_code.id,
+            user_id,
+        )
+        return ALREADY_USED
+    except Exception:
+        await release_promo_code(promo_code.id, user_id)
+        raise
+
+    await confirm_promo_code(promo_code.id, user_id)
+    return REDEEMED
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import BotSetting
+from config.settings import BOT_NAME, RECORD_INTERVAL
+from core.redis_client import redis
+from core.cache_loader import get_or_load, invalidate, jittered_ttl
+
+logger = logging.getLogger(BOT_NAME)
+
+SETTINGS_INVALIDATION_CHANNEL = "settings:invalidate"
+SETTINGS_CACHE_KEY = "bot_settings"
+
+DEFAULT_GREETING = "Привет! Администратор забыл настроить registered_user_greeting или new_user_greeting."
+
+
+def parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+class SettingSpec(NamedTuple):
+    name: str
+    parse: Callable[[str], Any]
+    default: Any
+    unit: str = ""
+    # Допустимый диапазон числовых настроек: значение вне его так же
+    # заменяется значением по умолчанию, как и нераспознанное
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+
+# Колонки BotSetting хранятся строками. Здесь для каждой задан тип,
+# значение по умолчанию, единица измерения и допустимый диапазон.
+SETTINGS_SPEC: List[SettingSpec] = [
+    SettingSpec("support_message", str, None),
+    SettingSpec("new_user_greeting", str, DEFAULT_GREETING),
+    SettingSpec("registered_user_greeting", str, DEFAULT_GREETING),
+    SettingSpec("technical_works", parse_bool, False),
+    SettingSpec("message_send_interval", float, 1.0, "сек.", 0, 60),
+    SettingSpec("check_interval", int, 60, "сек.", 1, 86400),
+    SettingSpec("max_requests", int, 30, "запросов", 1),
+    SettingSpec("request_period", int, 1, "сек.", 1),
+    SettingSpec("max_requests_per_user", int, 1, "запросов", 1),
+    SettingSpec("rate_limit_period", int, 1, "сек.", 1),
+    SettingSpec("update_interval", int, 60, "сек.", 1, 86400),
+    SettingSpec("post_cache_duration", int, 86400, "сек.", 60),
+    SettingSpec("message_fetch_limit", int, 100, "сообщений", 1, 1000),
+    SettingSpec("channel_check_interval", int, 60, "сек.", 1, 86400),
+    SettingSpec("post_relevance", int, 86400, "сек.", 1),
+    SettingSpec("user_search_ttl", int, 30, "сек.", 1),
+    SettingSpec("max_synonyms", int, 5, "синонимов", 0, 100),
+    SettingSpec("max_attempts", int, 3, "попыток", 1, 100),
+    SettingSpec("cache_ttl", int, RECORD_INTERVAL, "сек.", 1),
+    SettingSpec("anti_spam_rate_limit", float, 5.0, "запросов/сек.", 0.1),
+    SettingSpec("anti_spam_ban_time", int, 60, "сек.", 0),
+    SettingSpec("anti_spam_window_time", int, 10, "сек.", 1),
+    SettingSpec("anti_spam_smoothing_factor", float, 0.5, "", 0, 1),
+    SettingSpec("anti_spam_last_second_weight", float, 0.5, "", 0, 1),
+    SettingSpec("anti_spam_recovery_time", int, 30, "сек.", 0),
+    SettingSpec("concurrency_limit", int, 10, "задач", 1, 1000),
+    SettingSpec("message_concurrency_limit", int, 4, "задач", 1, 100),
+    SettingSpec("directions_concurrency_limit", int, 10, "задач", 1, 1000),
+    SettingSpec("ensure_connected_max_attempts", int, 5, "попыток", 1, 100),
+    SettingSpec("ensure_connected_wait_time", int, 5, "сек.", 0, 3600),
+    SettingSpec("ingestion_mode", str, "polling"),
+    SettingSpec("record_load_history_interval", int, 3600, "сек.", 1),
+]
+
+
+def _check_range(spec: SettingSpec, value: Any) -> Any:
+    if spec.minimum is not None and value < spec.minimum:
+        raise ValueError(f"меньше {spec.minimum}")
+    if spec.maximum is not None and value > spec.maximum:
+        raise ValueError(f"больше {spec.maximum}")
+    return value
+
+
+class SettingsSnapshot:
+    # Типизированный снимок настроек: строится один раз при изменении,
+    # чтение - обычный доступ к атрибуту без обращения к Redis или базе
+    def __init__(self, values: Optional[Dict[str, Optional[str]]] = None):
+        values = values or {}
+        self.sources: Dict[str, str] = {}
+
+        for spec in SETTINGS_SPEC:
+            raw_value = values.get(spec.name)
+            value, source = spec.default, "default"
+
+            if raw_value is not None and raw_value != "":
+                try:
+                    value = _check_range(spec, spec.parse(raw_value))
+                    source = "database"
+                except ValueError as e:
+                    value = spec.default
+                    logger.error(
+                        f"Некорректное значение настройки {spec.name}: "
+                        f"{raw_value!r} ({str(e)}), используется значение "
+                        f"по умолчанию {spec.default!r}."
+                    )
+
+            setattr(self, spec.name, value)
+            self.sources[spec.name] = source
+
+    def describe(self) -> List[str]:
+        lines = []
+        for spec in SETTINGS_SPEC:
+            value = getattr(self, spec.name)
+            unit = f" {spec.unit}" if spec.unit else ""
+            lines.append(f"{spec.name} = {value!r}{unit} ({self.sources[spec.name]})")
+        return lines
+
+
+async def load_bot_setting_values() -> Dict[str, Optional[str]]:
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(select(BotSetting).limit(1))
+        bot_setting = result.scalar_one_or_none()
+
+    if not bot_setting:
+        return {}
+    return {
+        column.name: getattr(bot_setting, column.name)
+        for column in BotSetting.__table__.columns
+    }
+
+
+class SettingsCache:
+    # Строка BotSetting хранится в памяти процесса. Обновляется по сообщению
+    # в канал settings:invalidate, а если сообщений нет - раз в ttl секунд.
+    def __init__(self, ttl: int = RECORD_INTERVAL):
+        self.ttl = ttl
+        self.settings = SettingsSnapshot()
+
+    async def refresh(self) -> None:
+        # Строка читается через общий кэш в Redis: при уведомлении об
+        # изменении базу читает один процесс, остальные получают его результат
+        values = await get_or_load(
+            SETTINGS_CACHE_KEY, load_bot_setting_values, self.ttl
+        )
+        self.settings = SettingsSnapshot(values)
+        logger.debug("Настройки бота загружены в память.")
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(SETTINGS_INVALIDATION_CHANNEL)
+                    # Сообщения могли быть пропущены, пока подписки не было
+                    await self.refresh()
+
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=jittered_ttl(self.ttl),
+                        )
+                        if message:
+                            logger.debug("Получено уведомление об изменении настроек.")
+                        await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка подписки на изменения настроек: {str(e)}")
+                await asyncio.sleep(5)
+
+
+settings_cache = SettingsCache()
+
+
+def get_settings() -> SettingsSnapshot:
+    return settings_cache.settings
+
+
+async def publish_settings_invalidation() -> None:
+    await invalidate(SETTINGS_CACHE_KEY)
+    await redis.publish(SETTINGS_INVALIDATION_CHANNEL, "1")
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from config.settings import BOT_NAME
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+UpdateProcessor = Callable[[dict], Awaitable[None]]
+
+SHARD_QUEUE_KEY = "updates:shard:{shard}"
+# Взятые из очереди, но еще не обработанные update шарда: если воркер
+# упал, перезапущенный воркер вернет их в очередь
+SHARD_PROCESSING_KEY = "updates:shard:{shard}:processing"
+SHARD_POLL_TIMEOUT = 1
+
+# Типы update, у которых есть отправитель
+USER_UPDATE_FIELDS = (
+    "message",
+    "edited_message",
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+
+
+def get_update_user_id(update: dict) -> Optional[int]:
+    for field in USER_UPDATE_FIELDS:
+        sender = (update.get(field) or {}).get("from")
+        if sender:
+            return sender["id"]
+    return None
+
+
+def get_shard(update: dict, shards: int) -> int:
+    user_id = get_update_user_id(update)
+    key = user_id if user_id is not None else update.get("update_id", 0)
+    return key % shards
+
+
+async def push_update(update: dict, shards: int) -> None:
+    # Все update одного пользователя попадают в очередь одного воркера,
+    # поэтому его FSM и кэш не обновляются из разных процессов
+    await redis.rpush(
+        SHARD_QUEUE_KEY.format(shard=get_shard(update, shards)), json.dumps(update)
+    )
+
+
+class ShardConsumer:
+    # Читает очередь своего шарда. Update разных пользователей
+    # обрабатываются параллельно, одного пользователя - по порядку.
+    def __init__(self, shard: int, process_update: UpdateProcessor, concurrency: int):
+        self.key = SHARD_QUEUE_KEY.format(shard=shard)
+        self.processing_key = SHARD_PROCESSING_KEY.format(shard=shard)
+        self.process_update = process_update
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._user_locks: Dict[int, asyncio.Lock] = {}
+        self._user_pending: Dict[int, int] = {}
+        self._tasks = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _requeue(self) -> None:
+        # Справа налево в голову очереди: update возвращаются в прежнем порядке
+        # и обрабатываются раньше пришедших после падения
+        requeued = 0
+        while await redis.lmove(self.processing_key, self.key, "RIGHT", "LEFT"):
+            requeued += 1
+        if requeued:
+            logger.info(
+                "В очередь %s возвращено необработанных update: %s.",
+                self.key,
+                requeued,
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._requeue()
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Ошибка возврата update в очередь {self.key}: {str(e)}"
+                )
+                await asyncio.sleep(1)
+
+        while True:
+            try:
+                await self._semaphore.acquire()
+                item = await redis.blmove(
+                    self.key,
+                    self.processing_key,
+                    SHARD_POLL_TIMEOUT,
+                    src="LEFT",
+                    dest="RIGHT",
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._semaphore.release()
+                logger.error(f"Ошибка чтения очереди {self.key}: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            if item is None:
+                self._semaphore.release()
+                continue
+
+            task = asyncio.create_task(self._process(item))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, item: str) -> None:
+        update = json.loads(item)
+        user_id = get_update_user_id(update)
+        lock = self._user_locks.setdefault(user_id, asyncio.Lock())
+        self._user_pending[user_id] = self._user_pending.get(user_id, 0) + 1
+        try:
+            async with lock:
+                await self.process_update(update)
+        except Exception as e:
+            logger.error(
+                f"Ошибка при обработке update {update.get('update_id')}: {str(e)}"
+            )
+        finally:
+            await self._ack(item)
+            self._user_pending[user_id] -= 1
+            if not self._user_pending[user_id]:
+                del self._user_pending[user_id]
+                del self._user_locks[user_id]
+            self._semaphore.release()
+
+    async def _ack(self, item: str) -> None:
+        try:
+            await redis.lrem(self.processing_key, 1, item)
+        except Exception as e:
+            logger.error(
+                f"Ошибка подтверждения update в {self.processing_key}: {str(e)}"
+            )
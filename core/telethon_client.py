@@ -1,9 +1,28 @@
 import os
+from typing import Callable, List
 from telethon import TelegramClient
 from config.settings import API_HASH, API_ID, PHONE_NUMBER, PASSWORD
 
 session_file_path = os.path.join(os.path.dirname(__file__), "telethon_session")
 
-telethon_client = TelegramClient(session_file_path, API_ID, API_HASH).start(
+
+class ReconnectAwareClient(TelegramClient):
+    # Telethon переподключается сам за несколько секунд и публично об этом
+    # не сообщает. _handle_auto_reconnect он вызывает после каждого
+    # автоматического переподключения - через него уведомляем подписчиков.
+    def __init__(self, *args, **kwargs):
+        self.reconnect_callbacks: List[Callable[[], None]] = []
+        super().__init__(*args, **kwargs)
+
+    def add_reconnect_callback(self, callback: Callable[[], None]) -> None:
+        self.reconnect_callbacks.append(callback)
+
+    async def _handle_auto_reconnect(self) -> None:
+        for callback in self.reconnect_callbacks:
+            callback()
+        await super()._handle_auto_reconnect()
+
+
+telethon_client = ReconnectAwareClient(session_file_path, API_ID, API_HASH).start(
     phone=PHONE_NUMBER, password=PASSWORD
 )
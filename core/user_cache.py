@@ -0,0 +1,189 @@
+import logging
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+from config.settings import BOT_NAME, RECORD_INTERVAL
+from core.redis_client import redis
+
+logger = logging.getLogger(BOT_NAME)
+
+# Все кэшированное состояние пользователя хранится в одном hash
+# user:{id} с полями subscription_end, is_banned, is_admin и directions.
+# TTL общий для всего hash и ставится только при создании (NX): запись
+# одного поля не продлевает жизнь остальным, поэтому is_banned и is_admin
+# не устаревают дольше RECORD_INTERVAL.
+FIELD_SUBSCRIPTION_END = "subscription_end"
+FIELD_IS_BANNED = "is_banned"
+FIELD_IS_ADMIN = "is_admin"
+FIELD_DIRECTIONS = "directions"
+
+USER_FIELDS = (
+    FIELD_SUBSCRIPTION_END,
+    FIELD_IS_BANNED,
+    FIELD_IS_ADMIN,
+    FIELD_DIRECTIONS,
+)
+
+# Hash, прочитанный в начале обработки update, переиспользуется
+# хэндлерами этого же update без повторных запросов к Redis
+current_user_cache: ContextVar[Optional[Tuple[int, Dict[str, str]]]] = ContextVar(
+    "current_user_cache", default=None
+)
+
+
+def _get_loaded_cache(user_id: int) -> Optional[Dict[str, str]]:
+    loaded = current_user_cache.get()
+    if loaded and loaded[0] == user_id:
+        return loaded[1]
+    return None
+
+
+def get_user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+async def get_user_cache(user_id: int) -> Dict[str, str]:
+    user_cache = await redis.hgetall(get_user_cache_key(user_id))
+    current_user_cache.set((user_id, user_cache))
+    return user_cache
+
+
+async def get_user_field(user_id: int, field: str) -> Optional[str]:
+    user_cache = _get_loaded_cache(user_id)
+    if user_cache is not None:
+        return user_cache.get(field)
+    return await redis.hget(get_user_cache_key(user_id), field)
+
+
+async def set_user_fields(user_id: int, mapping: Dict[str, str]) -> None:
+    key = get_user_cache_key(user_id)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, RECORD_INTERVAL, nx=True)
+        await pipe.execute()
+
+    user_cache = _get_loaded_cache(user_id)
+    if user_cache is not None:
+        user_cache.update(mapping)
+
+
+async def set_user_field(user_id: int, field: str, value: str) -> None:
+    await set_user_fields(user_id, {field: value})
+
+
+async def delete_user_fields(user_id: int, *fields: str) -> None:
+    await redis.hdel(get_user_cache_key(user_id), *fields)
+
+    user_cache = _get_loaded_cache(user_id)
+    if user_cache is not None:
+        for field in fields:
+            user_cache.pop(field, None)
+
+
+async def get_users_field(
+    user_ids: Iterable[int], field: str
+) -> Dict[int, Optional[str]]:
+    # Поле для многих пользователей читается за один запрос к Redis
+    values: Dict[int, Optional[str]] = {}
+    pending = []
+    for user_id in user_ids:
+        user_cache = _get_loaded_cache(user_id)
+        if user_cache is not None:
+            values[user_id] = user_cache.get(field)
+        else:
+            pending.append(user_id)
+
+    if pending:
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id in pending:
+                pipe.hget(get_user_cache_key(user_id), field)
+            values.update(zip(pending, await pipe.execute()))
+    return values
+
+
+async def set_users_field(values: Dict[int, str], field: str) -> None:
+    if not values:
+        return
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for user_id, value in values.items():
+            key = get_user_cache_key(user_id)
+            pipe.hset(key, field, value)
+            pipe.expire(key, RECORD_INTERVAL, nx=True)
+        await pipe.execute()
+
+    for user_id, value in values.items():
+        user_cache = _get_loaded_cache(user_id)
+        if user_cache is not None:
+            user_cache[field] = value
+
+
+async def migrate_legacy_user_keys(batch_size: int = 500) -> dict:
+    # Переносит старые ключи user:{id}:{field} в hash user:{id}. Ключи,
+    # которым нет поля в hash (is_search_active, promo_code_usage:*),
+    # больше никем не читаются и просто удаляются.
+    legacy_keys: Dict[int, Dict[str, str]] = {}
+    obsolete_keys = []
+    async for key in redis.scan_iter(match="user:*:*", count=batch_size):
+        _, user_id, field = key.split(":", 2)
+        if not user_id.isdigit():
+            continue
+        if field in USER_FIELDS:
+            legacy_keys.setdefault(int(user_id), {})[field] = key
+        else:
+            obsolete_keys.append(key)
+
+    stats = {
+        "users": 0,
+        "keys": 0,
+        "deleted": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+    }
+
+    for index in range(0, len(obsolete_keys), batch_size):
+        stats["deleted"] += await redis.delete(
+            *obsolete_keys[index : index + batch_size]
+        )
+
+    for user_id, fields in legacy_keys.items():
+        keys = list(fields.values())
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.type(key)
+                pipe.get(key)
+                pipe.ttl(key)
+                pipe.memory_usage(key)
+            results = await pipe.execute()
+
+        mapping = {}
+        ttl = RECORD_INTERVAL
+        for index, field in enumerate(fields):
+            key_type, value, key_ttl, memory = results[index * 4 : index * 4 + 4]
+            if key_type != "string" or value is None:
+                continue
+            mapping[field] = value
+            ttl = max(ttl, key_ttl) if key_ttl > 0 else ttl
+            stats["bytes_before"] += memory or 0
+
+        if not mapping:
+            continue
+
+        hash_key = get_user_cache_key(user_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(hash_key, mapping=mapping)
+            pipe.expire(hash_key, ttl)
+            pipe.delete(*(fields[field] for field in mapping))
+            await pipe.execute()
+
+        stats["bytes_after"] += await redis.memory_usage(hash_key) or 0
+        stats["users"] += 1
+        stats["keys"] += len(mapping)
+
+    logger.debug(
+        "Кэш пользователей перенесен в hash: %s пользователей, %s ключей, "
+        "%s устаревших ключей удалено.",
+        stats["users"],
+        stats["keys"],
+        stats["deleted"],
+    )
+    return stats
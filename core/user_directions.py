@@ -0,0 +1,80 @@
+import json
+import logging
+from typing import Dict, Iterable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from database.models import JobDirection, User, UserJobDirection
+from config.settings import BOT_NAME
+from core.user_cache import FIELD_DIRECTIONS, get_users_field, set_users_field
+
+logger = logging.getLogger(BOT_NAME)
+
+
+async def load_user_directions(user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    # Направления многих пользователей: один запрос к Redis за кэшем и
+    # один запрос к базе для всех промахов
+    user_ids = list(dict.fromkeys(user_ids))
+    cached = await get_users_field(user_ids, FIELD_DIRECTIONS)
+    user_directions = {
+        user_id: json.loads(value)
+        for user_id, value in cached.items()
+        if value is not None
+    }
+
+    missing = [user_id for user_id in user_ids if user_id not in user_directions]
+    if missing:
+        async with get_session() as session:
+            session: AsyncSession
+            result = await session.execute(
+                select(
+                    User.user_id,
+                    UserJobDirection.id,
+                    UserJobDirection.direction_id,
+                    UserJobDirection.selected_keywords,
+                    JobDirection.direction_name,
+                )
+                .select_from(User)
+                .outerjoin(UserJobDirection, UserJobDirection.user_id == User.id)
+                .outerjoin(
+                    JobDirection, JobDirection.id == UserJobDirection.direction_id
+                )
+                .filter(User.user_id.in_(missing))
+                .order_by(UserJobDirection.id)
+            )
+
+            loaded: Dict[int, List[dict]] = {}
+            for row in result:
+                directions = loaded.setdefault(row.user_id, [])
+                if row.id is None:
+                    continue
+                directions.append(
+                    {
+                        "id": row.id,
+                        "direction_id": row.direction_id,
+                        "selected_keywords": (
+                            row.selected_keywords.split("\n")
+                            if row.selected_keywords
+                            else []
+                        ),
+                        "direction_name": row.direction_name,
+                    }
+                )
+
+        # Незарегистрированные пользователи не кэшируются, как и раньше
+        await set_users_field(
+            {user_id: json.dumps(directions) for user_id, directions in loaded.items()},
+            FIELD_DIRECTIONS,
+        )
+        user_directions.update(loaded)
+        logger.debug(
+            "Направления загружены из базы для %s из %s пользователей.",
+            len(loaded),
+            len(missing),
+        )
+
+    return {user_id: user_directions.get(user_id, []) for user_id in user_ids}
+
+
+async def get_user_directions(user_id: int) -> List[dict]:
+    return (await load_user_directions([user_id]))[user_id]
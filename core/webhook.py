@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List, Optional
+from aiohttp import web
+from config.settings import BOT_NAME
+
+logger = logging.getLogger(BOT_NAME)
+
+UpdateProcessor = Callable[[dict], Awaitable[None]]
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookReceiver:
+    # Принимает update, сразу отвечает Telegram и кладет update в
+    # ограниченную очередь. Обрабатывают очередь concurrency воркеров.
+    # Если очередь заполнена, отвечаем 503: Telegram повторит доставку
+    # позже, а не потеряет update.
+    def __init__(
+        self,
+        process_update: UpdateProcessor,
+        queue_size: int,
+        concurrency: int,
+        secret_token: Optional[str] = None,
+    ):
+        self.process_update = process_update
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        self.secret_token = secret_token
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.rejected = 0
+
+    async def start(self, app: web.Application = None) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self, app: web.Application = None) -> None:
+        # Дорабатываем уже принятые update, затем останавливаем воркеров
+        if self._queue is not None:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if (
+            self.secret_token
+            and request.headers.get(SECRET_TOKEN_HEADER) != self.secret_token
+        ):
+            return web.Response(status=403)
+
+        try:
+            update = await request.json(loads=json.loads)
+        except ValueError:
+            return web.Response(status=400)
+
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.error(
+                "Очередь update заполнена (%s), update %s отклонен.",
+                self.queue_size,
+                update.get("update_id"),
+            )
+            return web.Response(status=503)
+
+        return web.Response()
+
+    async def _worker(self) -> None:
+        while True:
+            update = await self._queue.get()
+            try:
+                await self.process_update(update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Ошибка при обработке update {update.get('update_id')}: {str(e)}"
+                )
+            finally:
+                self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+
+def create_webhook_app(receiver: WebhookReceiver, path: str) -> web.Application:
+    app = web.Application()
+    app.router.add_post(path, receiver.handle)
+    app.on_startup.append(receiver.start)
+    app.on_shutdown.append(receiver.stop)
+    return app
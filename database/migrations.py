@@ -0,0 +1,204 @@
+import logging
+import re
+from typing import List, NamedTuple, Optional, Sequence, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from config.settings import BOT_NAME
+
+logger = logging.getLogger(BOT_NAME)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    statements: Sequence[str]
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции, зато он
+    # не блокирует запись в таблицу на работающей базе
+    transactional: bool = True
+
+
+# Миграции применяются по возрастанию версии. Уже выпущенные миграции не
+# меняются: любое изменение схемы - новая запись в конце списка.
+# Все операторы идемпотентны, поэтому миграции безопасно применять и к
+# базе, созданной через create_all по актуальным моделям.
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Колонки для событийного чтения каналов и настроек",
+        [
+            "ALTER TABLE channels ADD COLUMN IF NOT EXISTS last_message_id BIGINT",
+            "ALTER TABLE bot_settings ADD COLUMN IF NOT EXISTS ingestion_mode VARCHAR",
+            "ALTER TABLE bot_settings "
+            "ADD COLUMN IF NOT EXISTS record_load_history_interval VARCHAR",
+        ],
+    ),
+    Migration(
+        2,
+        "Индексы для горячих запросов",
+        [
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_job_directions_user_id "
+            "ON user_job_directions (user_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_promo_code_usage_user_id_promo_code_id "
+            "ON promo_code_usage (user_id, promo_code_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_load_history_timestamp "
+            "ON load_history (timestamp)",
+        ],
+        transactional=False,
+    ),
+    Migration(
+        3,
+        "Удаление повторных использований промокодов",
+        [
+            "DELETE FROM promo_code_usage AS usage "
+            "USING promo_code_usage AS earlier "
+            "WHERE usage.user_id = earlier.user_id "
+            "AND usage.promo_code_id = earlier.promo_code_id "
+            "AND usage.id > earlier.id",
+        ],
+    ),
+    Migration(
+        4,
+        "Уникальность использования промокода пользователем",
+        [
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+            "ux_promo_code_usage_user_id_promo_code_id "
+            "ON promo_code_usage (user_id, promo_code_id)",
+            "DROP INDEX CONCURRENTLY IF EXISTS "
+            "ix_promo_code_usage_user_id_promo_code_id",
+        ],
+        transactional=False,
+    ),
+    Migration(
+        5,
+        "Метрики процесса в истории загрузки",
+        [
+            "ALTER TABLE load_history ADD COLUMN IF NOT EXISTS loop_lag_ms BIGINT",
+            "ALTER TABLE load_history ADD COLUMN IF NOT EXISTS rss_bytes BIGINT",
+            "ALTER TABLE load_history ADD COLUMN IF NOT EXISTS db_connections BIGINT",
+            "ALTER TABLE load_history ADD COLUMN IF NOT EXISTS redis_connections BIGINT",
+        ],
+    ),
+    Migration(
+        6,
+        "Пересоздание уникального индекса промокодов, если он невалиден",
+        [
+            # Версия 4 могла быть записана поверх невалидного индекса: пока
+            # он не работал, повторные использования могли попасть в таблицу
+            "DELETE FROM promo_code_usage AS usage "
+            "USING promo_code_usage AS earlier "
+            "WHERE usage.user_id = earlier.user_id "
+            "AND usage.promo_code_id = earlier.promo_code_id "
+            "AND usage.id > earlier.id",
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+            "ux_promo_code_usage_user_id_promo_code_id "
+            "ON promo_code_usage (user_id, promo_code_id)",
+        ],
+        transactional=False,
+    ),
+    Migration(
+        7,
+        "Процесс, записавший строку истории загрузки",
+        [
+            "ALTER TABLE load_history ADD COLUMN IF NOT EXISTS process VARCHAR",
+        ],
+    ),
+]
+
+CREATE_INDEX_PATTERN = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)",
+    re.IGNORECASE,
+)
+
+# Неудачный CREATE INDEX CONCURRENTLY оставляет индекс с indisvalid = false.
+# IF NOT EXISTS такой индекс пропускает, и он так и не начинает работать.
+INVALID_INDEX_QUERY = """
+SELECT c.relname
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.relname = :name AND NOT i.indisvalid
+"""
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version BIGINT PRIMARY KEY,
+    description VARCHAR NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+)
+"""
+
+
+async def get_applied_versions(engine: AsyncEngine) -> Set[int]:
+    async with engine.begin() as conn:
+        await conn.execute(text(CREATE_MIGRATIONS_TABLE))
+        result = await conn.execute(text("SELECT version FROM schema_migrations"))
+        return {row.version for row in result}
+
+
+async def _record_version(conn, migration: Migration) -> None:
+    await conn.execute(
+        text(
+            "INSERT INTO schema_migrations (version, description) "
+            "VALUES (:version, :description) ON CONFLICT DO NOTHING"
+        ),
+        {"version": migration.version, "description": migration.description},
+    )
+
+
+def _created_index_name(statement: str) -> Optional[str]:
+    match = CREATE_INDEX_PATTERN.search(statement)
+    return match.group(1) if match else None
+
+
+async def _is_index_invalid(conn, name: str) -> bool:
+    result = await conn.execute(text(INVALID_INDEX_QUERY), {"name": name})
+    return result.first() is not None
+
+
+async def apply_migration(engine: AsyncEngine, migration: Migration) -> None:
+    if migration.transactional:
+        async with engine.begin() as conn:
+            for statement in migration.statements:
+                await conn.execute(text(statement))
+            await _record_version(conn, migration)
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        created_indexes = []
+        for statement in migration.statements:
+            index_name = _created_index_name(statement)
+            if index_name:
+                # Остаток прошлой неудачной попытки удаляем, иначе
+                # IF NOT EXISTS не создаст индекс заново
+                if await _is_index_invalid(conn, index_name):
+                    logger.debug("Удаляется невалидный индекс %s.", index_name)
+                    await conn.execute(
+                        text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+                    )
+                created_indexes.append(index_name)
+            await conn.execute(text(statement))
+
+        for index_name in created_indexes:
+            if await _is_index_invalid(conn, index_name):
+                raise RuntimeError(
+                    f"Индекс {index_name} создан невалидным, "
+                    f"миграция {migration.version} не записана"
+                )
+        await _record_version(conn, migration)
+
+
+async def apply_migrations(engine: AsyncEngine) -> List[Migration]:
+    applied_versions = await get_applied_versions(engine)
+    pending = [
+        migration
+        for migration in sorted(MIGRATIONS, key=lambda migration: migration.version)
+        if migration.version not in applied_versions
+    ]
+
+    for migration in pending:
+        logger.debug(
+            "Применяется миграция %s: %s", migration.version, migration.description
+        )
+        await apply_migration(engine, migration)
+
+    return pending
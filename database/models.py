@@ -5,6 +5,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Interval,
 )
 from sqlalchemy.orm import relationship, declarative_base
@@ -50,7 +51,7 @@ class UserJobDirection(Base):
     __tablename__ = "user_job_directions"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False, index=True)
     direction_id = Column(BigInteger, ForeignKey("job_directions.id"), nullable=False)
     selected_keywords = Column(String, nullable=True)
 
@@ -69,6 +70,15 @@ class PromoCodeUsage(Base):
     user = relationship("User", backref="promo_code_usages")
     promo_code = relationship("PromoCode", backref="usages")
 
+    __table_args__ = (
+        Index(
+            "ux_promo_code_usage_user_id_promo_code_id",
+            "user_id",
+            "promo_code_id",
+            unique=True,
+        ),
+    )
+
 
 class SubscriptionPlan(Base):
     __tablename__ = "subscription_plans"
@@ -113,6 +123,8 @@ class BotSetting(Base):
     directions_concurrency_limit = Column(String, nullable=True)
     ensure_connected_max_attempts = Column(String, nullable=True)
     ensure_connected_wait_time = Column(String, nullable=True)
+    ingestion_mode = Column(String, nullable=True)
+    record_load_history_interval = Column(String, nullable=True)
 
 
 class Channel(Base):
@@ -120,13 +132,20 @@ class Channel(Base):
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     name = Column(String, unique=True, nullable=False)
+    last_message_id = Column(BigInteger, nullable=True)
 
 
 class LoadHistory(Base):
     __tablename__ = "load_history"
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, default=func.now(), nullable=False)
+    timestamp = Column(DateTime, default=func.now(), nullable=False, index=True)
     cpu_load = Column(BigInteger, nullable=False)
     memory_load = Column(BigInteger, nullable=False)
     average_load = Column(BigInteger, nullable=False)
+    loop_lag_ms = Column(BigInteger, nullable=True)
+    rss_bytes = Column(BigInteger, nullable=True)
+    db_connections = Column(BigInteger, nullable=True)
+    redis_connections = Column(BigInteger, nullable=True)
+    # Каждый процесс бота пишет свои строки: host:pid
+    process = Column(String, nullable=True)
@@ -6,15 +6,20 @@ from sqlalchemy.future import select
 from database.database import get_session
 from database.models import User
 from keyboards.admin.inline import admin_menu
-from config.settings import BOT_NAME, RECORD_INTERVAL
-from core.redis_client import redis
+from config.settings import BOT_NAME
+from core.delivery import PRIORITY_INTERACTIVE, delivery_scheduler
+from core.user_cache import FIELD_IS_ADMIN, get_user_field, set_user_field
 
 logger = logging.getLogger(BOT_NAME)
 
 
-async def admin(message: types.Message) -> None:
+async def admin(message: types.Message, user_context: dict = None) -> None:
     user_id = message.from_user.id
-    is_admin = await redis.get(f"user:{user_id}:is_admin")
+
+    if user_context:
+        is_admin = "1" if user_context["is_admin"] else "0"
+    else:
+        is_admin = await get_user_field(user_id, FIELD_IS_ADMIN)
 
     if is_admin is None:
         async with get_session() as session:
@@ -26,24 +31,25 @@ async def admin(message: types.Message) -> None:
 
             if user:
                 is_admin = "1"
-                await redis.set(
-                    f"user:{user_id}:is_admin", is_admin, ex=RECORD_INTERVAL
-                )
+                await set_user_field(user_id, FIELD_IS_ADMIN, is_admin)
                 logger.debug(
-                    f"Пользователь {user_id} добавлен в Redis как администратор."
+                    "Пользователь %s добавлен в Redis как администратор.", user_id
                 )
             else:
                 is_admin = "0"
-                await redis.set(
-                    f"user:{user_id}:is_admin", is_admin, ex=RECORD_INTERVAL
-                )
+                await set_user_field(user_id, FIELD_IS_ADMIN, is_admin)
                 logger.debug(
-                    f"Пользователь {user_id} добавлен в Redis как не администратор."
+                    "Пользователь %s добавлен в Redis как не администратор.", user_id
                 )
 
     if is_admin == "1":
         await message.delete()
-        await message.answer("👑 Админ-меню:", reply_markup=admin_menu())
+        await delivery_scheduler.send(
+            message.chat.id,
+            "👑 Админ-меню:",
+            reply_markup=admin_menu(),
+            priority=PRIORITY_INTERACTIVE,
+        )
 
 
 async def close_menu(call: types.CallbackQuery, state: FSMContext = None) -> None:
@@ -1,4 +1,3 @@
-import json
 import logging
 from sqlalchemy.orm import selectinload
 from aiogram.dispatcher import FSMContext
@@ -10,8 +9,17 @@ from database.database import get_session
 from database.models import JobDirection, User, UserJobDirection
 from handlers.profile.profile import close_menu
 from handlers.admin.utils import paginate_items
-from config.settings import BOT_NAME, RECORD_INTERVAL
-from core.redis_client import redis
+from config.settings import BOT_NAME
+from core.cache_loader import get_or_load, invalidate
+from core.user_cache import FIELD_DIRECTIONS, delete_user_fields
+from core.user_directions import get_user_directions
+from core.parser.keyword_matcher import invalidate_keyword_matcher
+from core.parser.synonyms import mark_synonyms_stale
+from core.parser.keyword_index import (
+    add_direction_keywords,
+    remove_direction_keywords,
+    replace_direction_keywords,
+)
 from keyboards.profile.inline import (
     create_profile_direction_menu_keyboard,
     create_profile_edit_direction_keyboard,
@@ -43,94 +51,45 @@ class DeleteUserDirectionState(StatesGroup):
     waiting_for_confirmation = State()
 
 
-async def get_all_job_directions():
-    directions_cache_key = "job_directions"
-    cached_directions = await redis.get(directions_cache_key)
-    if cached_directions:
-        job_directions = json.loads(cached_directions)
-    else:
-        async with get_session() as session:
-            session: AsyncSession
-            result = await session.execute(select(JobDirection))
-            job_directions = result.scalars().all()
-            job_directions = [
-                {
-                    "id": direction.id,
-                    "direction_name": direction.direction_name,
-                    "recommended_keywords": direction.recommended_keywords,
-                }
-                for direction in job_directions
-            ]
-            await redis.set(
-                directions_cache_key, json.dumps(job_directions), ex=RECORD_INTERVAL
-            )
-    return job_directions
+async def load_all_job_directions():
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(select(JobDirection))
+        job_directions = result.scalars().all()
+        return [
+            {
+                "id": direction.id,
+                "direction_name": direction.direction_name,
+                "recommended_keywords": direction.recommended_keywords,
+            }
+            for direction in job_directions
+        ]
 
 
-async def get_user_directions(user_id: int):
-    directions_cache_key = f"user:{user_id}:directions"
-    cached_directions = await redis.get(directions_cache_key)
-    if cached_directions:
-        user_directions = json.loads(cached_directions)
-        logger.debug(f"user_directions cached: {user_directions}")
-    else:
-        async with get_session() as session:
-            session: AsyncSession
-            result = await session.execute(select(User).filter_by(user_id=user_id))
-            user = result.scalar_one_or_none()
-            if not user:
-                logger.debug(f"User not found for user_id {user_id}.")
-                return []
-
-            internal_user_id = user.id
-            result = await session.execute(
-                select(UserJobDirection)
-                .filter_by(user_id=internal_user_id)
-                .options(selectinload(UserJobDirection.direction))
-            )
-            user_directions = result.scalars().all()
-
-            user_directions = [
-                {
-                    "id": user_direction.id,
-                    "direction_id": user_direction.direction_id,
-                    "selected_keywords": (
-                        user_direction.selected_keywords.split("\n")
-                        if user_direction.selected_keywords
-                        else []
-                    ),
-                    "direction_name": user_direction.direction.direction_name,
-                }
-                for user_direction in user_directions
-            ]
-            logger.debug(f"user_directions cache create: {user_directions}")
-            await redis.set(
-                directions_cache_key, json.dumps(user_directions), ex=RECORD_INTERVAL
-            )
-    return user_directions
+async def get_all_job_directions():
+    return await get_or_load("job_directions", load_all_job_directions)
 
 
 async def get_keywords_for_direction(direction_id: int):
-    keywords_cache_key = f"job_direction:{direction_id}:keywords"
-    cached_keywords = await redis.get(keywords_cache_key)
-    if cached_keywords:
-        keywords = json.loads(cached_keywords)
-    else:
+    async def load_keywords():
         async with get_session() as session:
             session: AsyncSession
             direction = await session.get(JobDirection, direction_id)
             if not direction:
-                return []
-            keywords = direction.recommended_keywords.split("\n")
-            await redis.set(
-                keywords_cache_key, json.dumps(keywords), ex=RECORD_INTERVAL
-            )
-    return keywords
+                return None
+            return direction.recommended_keywords.split("\n")
+
+    keywords = await get_or_load(
+        f"job_direction:{direction_id}:keywords", load_keywords
+    )
+    return keywords or []
 
 
 async def paginate_directions(call: CallbackQuery, state: FSMContext = None):
     logger.debug(
-        f"paginate_directions called with call.data: {call.data}, user_id: {call.from_user.id}"
+        "paginate_directions called with call.data: %s, user_id: %s",
+        call.data,
+        call.from_user.id,
     )
 
     if state:
@@ -143,7 +102,10 @@ async def paginate_directions(call: CallbackQuery, state: FSMContext = None):
     limit = 6
 
     logger.debug(
-        f"Extracting directions for user_id: {user_id}, page: {page}, limit: {limit}"
+        "Extracting directions for user_id: %s, page: %s, limit: %s",
+        user_id,
+        page,
+        limit,
     )
 
     user_directions = await get_user_directions(user_id)
@@ -152,7 +114,7 @@ async def paginate_directions(call: CallbackQuery, state: FSMContext = None):
     page_directions = user_directions[start_idx : start_idx + limit]
     has_next = len(user_directions) > page * limit
 
-    logger.debug(f"Total directions: {len(user_directions)}, has_next: {has_next}")
+    logger.debug("Total directions: %s, has_next: %s", len(user_directions), has_next)
     await paginate_items(
         call=call,
         items=page_directions,
@@ -164,9 +126,12 @@ async def paginate_directions(call: CallbackQuery, state: FSMContext = None):
 
 
 async def add_direction_start(call: CallbackQuery, state: FSMContext):
-    logger.debug(
-        f"add_direction_start called with call.data: {call.data}\nget_state: {await state.get_state()}"
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "add_direction_start called with call.data: %s\nget_state: %s",
+            call.data,
+            await state.get_state(),
+        )
     job_directions = await get_all_job_directions()
     await paginate_items(
         call=call,
@@ -179,10 +144,10 @@ async def add_direction_start(call: CallbackQuery, state: FSMContext):
 
 
 async def select_direction(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"select_direction called with call.data: {call.data}")
+    logger.debug("select_direction called with call.data: %s", call.data)
 
     direction_id = int(call.data.split("_")[-1])
-    logger.debug(f"Selected direction_id: {direction_id}")
+    logger.debug("Selected direction_id: %s", direction_id)
 
     if call.data.endswith("back"):
         logger.debug("Navigating back")
@@ -200,7 +165,7 @@ async def select_direction(call: CallbackQuery, state: FSMContext):
 
 
 async def paginate_keywords(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"paginate_keywords called with call.data: {call.data}")
+    logger.debug("paginate_keywords called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
@@ -217,7 +182,11 @@ async def paginate_keywords(call: CallbackQuery, state: FSMContext):
     await state.update_data(current_keyword_page=page)
 
     logger.debug(
-        f"Direction id: {direction_id}, Keywords: {keywords}, Selected keywords: {selected_keywords}, Page: {page}"
+        "Direction id: %s, Keywords: %s, Selected keywords: %s, Page: %s",
+        direction_id,
+        keywords,
+        selected_keywords,
+        page,
     )
 
     await paginate_items(
@@ -233,18 +202,23 @@ async def paginate_keywords(call: CallbackQuery, state: FSMContext):
 
 
 async def select_keyword(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"select_keyword called with call.data: {call.data}")
+    logger.debug("select_keyword called with call.data: %s", call.data)
 
     selected_keywords = (await state.get_data()).get("selected_keywords", [])
     keyword = call.data.split("_")[-1]
 
     logger.debug(
-        f"Selected keyword: {keyword}, Current selected keywords: {selected_keywords}"
+        "Selected keyword: %s, Current selected keywords: %s",
+        keyword,
+        selected_keywords,
     )
 
-    logger.debug(
-        f"Current redis state: {await state.get_state()}\n'keyword' arg: {keyword}"
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Current redis state: %s\n'keyword' arg: %s",
+            await state.get_state(),
+            keyword,
+        )
 
     if keyword == "back":
         logger.debug("Navigating back to add direction")
@@ -257,17 +231,17 @@ async def select_keyword(call: CallbackQuery, state: FSMContext):
 
     if keyword in selected_keywords:
         selected_keywords.remove(keyword)
-        logger.debug(f"Keyword {keyword} removed from selection")
+        logger.debug("Keyword %s removed from selection", keyword)
     else:
         selected_keywords.append(keyword)
-        logger.debug(f"Keyword {keyword} added to selection")
+        logger.debug("Keyword %s added to selection", keyword)
 
     await state.update_data(selected_keywords=selected_keywords)
 
     data = await state.get_data()
     current_page = data.get("current_keyword_page", 1)
 
-    logger.debug(f"Re-paginating keywords with current_page: {current_page}")
+    logger.debug("Re-paginating keywords with current_page: %s", current_page)
 
     await paginate_keywords(call, state)
 
@@ -278,7 +252,7 @@ async def select_all_keywords(call: CallbackQuery, state: FSMContext):
     if call.data.startswith("profile_keywords_edit_"):
         is_editing = True
 
-    logger.debug(f"select_all_keywords called with call.data: {call.data}")
+    logger.debug("select_all_keywords called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = (
@@ -299,7 +273,7 @@ async def deselect_all_keywords(call: CallbackQuery, state: FSMContext):
     if call.data.startswith("profile_keywords_edit_"):
         is_editing = True
 
-    logger.debug(f"deselect_all_keywords called with call.data: {call.data}")
+    logger.debug("deselect_all_keywords called with call.data: %s", call.data)
 
     await state.update_data(selected_keywords=[])
 
@@ -312,14 +286,16 @@ async def deselect_all_keywords(call: CallbackQuery, state: FSMContext):
 
 
 async def confirm_add_direction(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"confirm_add_direction called with call.data: {call.data}")
+    logger.debug("confirm_add_direction called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
     selected_keywords = data.get("selected_keywords", [])
 
     logger.debug(
-        f"Confirming addition of direction {direction_id} with keywords: {selected_keywords}"
+        "Confirming addition of direction %s with keywords: %s",
+        direction_id,
+        selected_keywords,
     )
 
     job_directions = await get_all_job_directions()
@@ -345,11 +321,12 @@ async def confirm_add_direction(call: CallbackQuery, state: FSMContext):
     )
 
     await AddUserDirectionState.waiting_for_confirmation.set()
-    logger.debug(f"After setting state: {await state.get_state()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("After setting state: %s", await state.get_state())
 
 
 async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"add_direction_confirm called with call.data: {call.data}")
+    logger.debug("add_direction_confirm called with call.data: %s", call.data)
 
     data = await state.get_data()
 
@@ -358,7 +335,9 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
         selected_keywords = data.get("selected_keywords", [])
 
         logger.debug(
-            f"Attempting to add direction {direction_id} with selected keywords {selected_keywords}"
+            "Attempting to add direction %s with selected keywords %s",
+            direction_id,
+            selected_keywords,
         )
 
         telegram_user_id = call.from_user.id
@@ -373,7 +352,8 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
 
             if not user:
                 logger.debug(
-                    f"User not found in database for Telegram user_id {telegram_user_id}."
+                    "User not found in database for Telegram user_id %s.",
+                    telegram_user_id,
                 )
                 return
 
@@ -389,7 +369,9 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
 
             if existing_direction:
                 logger.debug(
-                    f"Direction {direction_id} already exists for user {internal_user_id}"
+                    "Direction %s already exists for user %s",
+                    direction_id,
+                    internal_user_id,
                 )
                 await call.message.edit_text(
                     "⚠️ Это направление уже существует в твоем профиле.",
@@ -397,7 +379,9 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
                 )
             else:
                 logger.debug(
-                    f"Adding new direction {direction_id} for user {internal_user_id}"
+                    "Adding new direction %s for user %s",
+                    direction_id,
+                    internal_user_id,
                 )
 
                 new_direction = UserJobDirection(
@@ -408,7 +392,10 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
                 session.add(new_direction)
                 await session.commit()
 
-                await redis.delete(f"user:{telegram_user_id}:directions")
+                await delete_user_fields(telegram_user_id, FIELD_DIRECTIONS)
+                await add_direction_keywords(new_direction.id, selected_keywords)
+                await invalidate_keyword_matcher()
+                await mark_synonyms_stale()
 
                 await call.message.edit_text(
                     "✅ Направление успешно добавлено.",
@@ -428,27 +415,27 @@ async def add_direction_confirm(call: CallbackQuery, state: FSMContext):
 
 
 async def edit_direction(call: CallbackQuery, state: FSMContext = None):
-    logger.debug(f"edit_direction called with call.data: {call.data}")
+    logger.debug("edit_direction called with call.data: %s", call.data)
 
     if state:
         logger.debug("Finishing current FSM state")
         await state.finish()
 
     direction_id = int(call.data.split("_")[-1])
-    logger.debug(f"Selected direction_id for edit: {direction_id}")
+    logger.debug("Selected direction_id for edit: %s", direction_id)
 
     user_id = call.from_user.id
     user_directions = await get_user_directions(user_id)
 
     user_direction = next((d for d in user_directions if d["id"] == direction_id), None)
     if user_direction:
-        logger.debug(f"Editing direction: {user_direction['direction_name']}")
+        logger.debug("Editing direction: %s", user_direction["direction_name"])
         await call.message.edit_text(
             text=f"💭 Выбери, что редактировать в направлении '{user_direction['direction_name']}':",
             reply_markup=create_profile_edit_direction_keyboard(user_direction["id"]),
         )
     else:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             f"⚠️ Направление не найдено или отсутствует в профиле",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -456,14 +443,14 @@ async def edit_direction(call: CallbackQuery, state: FSMContext = None):
 
 
 async def show_direction_details(call: CallbackQuery, state: FSMContext = None):
-    logger.debug(f"show_direction_details called with call.data: {call.data}")
+    logger.debug("show_direction_details called with call.data: %s", call.data)
 
     if state:
         logger.debug("Finishing current FSM state")
         await state.finish()
 
     direction_id = int(call.data.split("_")[-1])
-    logger.debug(f"Showing details for direction_id: {direction_id}")
+    logger.debug("Showing details for direction_id: %s", direction_id)
 
     user_id = call.from_user.id
     user_directions = await get_user_directions(user_id)
@@ -471,7 +458,7 @@ async def show_direction_details(call: CallbackQuery, state: FSMContext = None):
 
     if user_direction:
         logger.debug(
-            f"Displaying details for direction: {user_direction['direction_name']}"
+            "Displaying details for direction: %s", user_direction["direction_name"]
         )
         await call.message.edit_text(
             f"📝 Направление: {user_direction['direction_name']}\n"
@@ -479,7 +466,7 @@ async def show_direction_details(call: CallbackQuery, state: FSMContext = None):
             reply_markup=create_profile_direction_menu_keyboard(user_direction["id"]),
         )
     else:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в профиле",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -487,10 +474,10 @@ async def show_direction_details(call: CallbackQuery, state: FSMContext = None):
 
 
 async def edit_direction_keywords_start(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"edit_direction_keywords_start called with call.data: {call.data}")
+    logger.debug("edit_direction_keywords_start called with call.data: %s", call.data)
 
     direction_id = int(call.data.split("_")[-1])
-    logger.debug(f"Starting keyword edit for direction_id: {direction_id}")
+    logger.debug("Starting keyword edit for direction_id: %s", direction_id)
 
     user_id = call.from_user.id
 
@@ -500,12 +487,12 @@ async def edit_direction_keywords_start(call: CallbackQuery, state: FSMContext):
 
     if user_direction:
         logger.debug(
-            f"Current direction keywords: {user_direction['selected_keywords']}"
+            "Current direction keywords: %s", user_direction["selected_keywords"]
         )
 
         keywords = await get_keywords_for_direction(user_direction["direction_id"])
         selected_keywords = user_direction["selected_keywords"]
-        logger.debug(f"Selected keywords from database: {selected_keywords}")
+        logger.debug("Selected keywords from database: %s", selected_keywords)
 
         page = 1
         limit = 6
@@ -532,7 +519,7 @@ async def edit_direction_keywords_start(call: CallbackQuery, state: FSMContext):
             selected_keywords=selected_keywords,
         )
     else:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в профиле.",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -540,7 +527,7 @@ async def edit_direction_keywords_start(call: CallbackQuery, state: FSMContext):
 
 
 async def edit_direction_keywords(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"edit_direction_keywords called with call.data: {call.data}")
+    logger.debug("edit_direction_keywords called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
@@ -550,7 +537,7 @@ async def edit_direction_keywords(call: CallbackQuery, state: FSMContext):
     user_direction = next((d for d in user_directions if d["id"] == direction_id), None)
 
     if not user_direction:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в профиле.",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -561,7 +548,9 @@ async def edit_direction_keywords(call: CallbackQuery, state: FSMContext):
     keyword = call.data.split("_")[-1]
 
     logger.debug(
-        f"Selected keyword: {keyword}, Current selected keywords: {selected_keywords}"
+        "Selected keyword: %s, Current selected keywords: %s",
+        keyword,
+        selected_keywords,
     )
 
     if keyword == "back":
@@ -575,24 +564,26 @@ async def edit_direction_keywords(call: CallbackQuery, state: FSMContext):
 
     if keyword in selected_keywords:
         selected_keywords.remove(keyword)
-        logger.debug(f"Keyword {keyword} removed from selection")
+        logger.debug("Keyword %s removed from selection", keyword)
     else:
         selected_keywords.append(keyword)
-        logger.debug(f"Keyword {keyword} added to selection")
+        logger.debug("Keyword %s added to selection", keyword)
 
     await state.update_data(selected_keywords=selected_keywords)
     await paginate_edit_keywords(call, state)
 
 
 async def confirm_edit_direction_keywords(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"confirm_edit_direction_keywords called with call.data: {call.data}")
+    logger.debug("confirm_edit_direction_keywords called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
     selected_keywords = data.get("selected_keywords", [])
 
     logger.debug(
-        f"Confirming keyword change for direction_id: {direction_id} with selected keywords: {selected_keywords}"
+        "Confirming keyword change for direction_id: %s with selected keywords: %s",
+        direction_id,
+        selected_keywords,
     )
 
     user_id = call.from_user.id
@@ -600,7 +591,7 @@ async def confirm_edit_direction_keywords(call: CallbackQuery, state: FSMContext
     user_direction = next((d for d in user_directions if d["id"] == direction_id), None)
 
     if not user_direction:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в профиле.",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -620,13 +611,13 @@ async def confirm_edit_direction_keywords(call: CallbackQuery, state: FSMContext
 
 
 async def edit_direction_confirm(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"edit_direction_confirm called with call.data: {call.data}")
+    logger.debug("edit_direction_confirm called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
 
     if call.data == "profile_confirm_edit_direction_keywords_yes":
-        logger.debug(f"Saving keyword changes for direction_id: {direction_id}")
+        logger.debug("Saving keyword changes for direction_id: %s", direction_id)
 
         async with get_session() as session:
             session: AsyncSession
@@ -634,13 +625,19 @@ async def edit_direction_confirm(call: CallbackQuery, state: FSMContext):
             user_direction = await session.get(UserJobDirection, direction_id)
 
             if user_direction:
+                old_keywords = (user_direction.selected_keywords or "").split("\n")
+
                 # Обновляем ключевые слова направления
                 user_direction.selected_keywords = "\n".join(data["selected_keywords"])
                 await session.commit()
 
                 # Удаляем кеш для направлений пользователя
-                directions_cache_key = f"user:{call.from_user.id}:directions"
-                await redis.delete(directions_cache_key)
+                await delete_user_fields(call.from_user.id, FIELD_DIRECTIONS)
+                await replace_direction_keywords(
+                    direction_id, old_keywords, data["selected_keywords"]
+                )
+                await invalidate_keyword_matcher()
+                await mark_synonyms_stale()
 
                 logger.debug("Keywords successfully updated")
                 await call.message.edit_text(
@@ -651,7 +648,7 @@ async def edit_direction_confirm(call: CallbackQuery, state: FSMContext):
                 )
             else:
                 logger.debug(
-                    f"UserJobDirection not found for direction_id {direction_id}."
+                    "UserJobDirection not found for direction_id %s.", direction_id
                 )
                 await call.message.edit_text(
                     "❌ Не удалось найти направление для изменения ключевых слов.",
@@ -674,7 +671,7 @@ async def edit_direction_confirm(call: CallbackQuery, state: FSMContext):
 
 
 async def confirm_delete_direction(call: CallbackQuery):
-    logger.debug(f"confirm_delete_direction called with call.data: {call.data}")
+    logger.debug("confirm_delete_direction called with call.data: %s", call.data)
 
     direction_id = int(call.data.split("_")[-1])
     user_id = call.from_user.id
@@ -684,7 +681,7 @@ async def confirm_delete_direction(call: CallbackQuery):
     user_direction = next((d for d in user_directions if d["id"] == direction_id), None)
 
     if not user_direction:
-        logger.debug(f"User direction {direction_id} not found.")
+        logger.debug("User direction %s not found.", direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в профиле.",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -692,7 +689,7 @@ async def confirm_delete_direction(call: CallbackQuery):
         return
 
     logger.debug(
-        f"Confirming deletion of direction: {user_direction['direction_name']}"
+        "Confirming deletion of direction: %s", user_direction["direction_name"]
     )
 
     await call.message.edit_text(
@@ -708,7 +705,7 @@ async def confirm_delete_direction(call: CallbackQuery):
 
 
 async def delete_direction(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"delete_direction called with call.data: {call.data}")
+    logger.debug("delete_direction called with call.data: %s", call.data)
 
     direction_id = int(call.data.split("_")[-1])
 
@@ -724,25 +721,31 @@ async def delete_direction(call: CallbackQuery, state: FSMContext):
 
         if user_direction:
             logger.debug(
-                f"Deleting direction: {user_direction.direction.direction_name}"
+                "Deleting direction: %s", user_direction.direction.direction_name
             )
             await session.delete(user_direction)
             await session.commit()
 
             user_id = call.from_user.id
-            directions_cache_key = f"user:{user_id}:directions"
             keywords_cache_key = f"job_direction:{user_direction.direction_id}:keywords"
 
             # Удаляем кэш в Redis
-            await redis.delete(directions_cache_key)
-            await redis.delete(keywords_cache_key)
+            await delete_user_fields(user_id, FIELD_DIRECTIONS)
+            await invalidate(keywords_cache_key)
+            await remove_direction_keywords(
+                user_direction.id, (user_direction.selected_keywords or "").split("\n")
+            )
+            await invalidate_keyword_matcher()
+            await mark_synonyms_stale()
 
             await call.message.edit_text(
                 f"🗑️ Направление '{user_direction.direction.direction_name}' было удалено.",
                 reply_markup=create_close_back_keyboard(f"profile_directions_back"),
             )
         else:
-            logger.debug(f"UserJobDirection not found for direction_id {direction_id}.")
+            logger.debug(
+                "UserJobDirection not found for direction_id %s.", direction_id
+            )
             await call.message.edit_text(
                 "❌ Не удалось найти направление для удаления.",
                 reply_markup=create_close_back_keyboard(f"profile_directions_back"),
@@ -754,7 +757,7 @@ async def delete_direction(call: CallbackQuery, state: FSMContext):
 
 
 async def cancel_delete_direction(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"cancel_delete_direction called with call.data: {call.data}")
+    logger.debug("cancel_delete_direction called with call.data: %s", call.data)
     direction_id = int(call.data.split("_")[-1])
 
     await call.message.edit_text(
@@ -767,21 +770,23 @@ async def cancel_delete_direction(call: CallbackQuery, state: FSMContext):
 
 
 async def edit_select_keyword(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"edit_select_keyword called with call.data: {call.data}")
+    logger.debug("edit_select_keyword called with call.data: %s", call.data)
 
     selected_keywords = (await state.get_data()).get("selected_keywords", [])
     keyword = call.data.split("_")[-1]
 
     logger.debug(
-        f"Selected keyword: {keyword}, Current selected keywords: {selected_keywords}"
+        "Selected keyword: %s, Current selected keywords: %s",
+        keyword,
+        selected_keywords,
     )
 
     if keyword in selected_keywords:
         selected_keywords.remove(keyword)
-        logger.debug(f"Keyword {keyword} removed from selection")
+        logger.debug("Keyword %s removed from selection", keyword)
     else:
         selected_keywords.append(keyword)
-        logger.debug(f"Keyword {keyword} added to selection")
+        logger.debug("Keyword %s added to selection", keyword)
 
     await state.update_data(selected_keywords=selected_keywords)
 
@@ -789,7 +794,7 @@ async def edit_select_keyword(call: CallbackQuery, state: FSMContext):
 
 
 async def paginate_edit_keywords(call: CallbackQuery, state: FSMContext):
-    logger.debug(f"paginate_edit_keywords called with call.data: {call.data}")
+    logger.debug("paginate_edit_keywords called with call.data: %s", call.data)
 
     data = await state.get_data()
     direction_id = data.get("direction_id")
@@ -800,7 +805,7 @@ async def paginate_edit_keywords(call: CallbackQuery, state: FSMContext):
     direction = next((d for d in all_directions if d["id"] == job_direction_id), None)
 
     if not direction:
-        logger.debug(f"JobDirection с id {job_direction_id} не найден.")
+        logger.debug("JobDirection с id %s не найден.", job_direction_id)
         await call.message.edit_text(
             "⚠️ Направление не найдено или отсутствует в системе.",
             reply_markup=create_close_back_keyboard("profile_directions_back"),
@@ -826,7 +831,12 @@ async def paginate_edit_keywords(call: CallbackQuery, state: FSMContext):
     await state.update_data(current_keyword_page=page)
 
     logger.debug(
-        f"Direction id: {direction_id}, Job Direction id: {job_direction_id}, Keywords: {keywords}, Filtered selected keywords: {filtered_selected_keywords}, Page: {page}"
+        "Direction id: %s, Job Direction id: %s, Keywords: %s, Filtered selected keywords: %s, Page: %s",
+        direction_id,
+        job_direction_id,
+        keywords,
+        filtered_selected_keywords,
+        page,
     )
 
     limit = 6
@@ -6,6 +6,7 @@ from database.database import get_session
 from aiogram.dispatcher import FSMContext
 from database.models import User
 from config.settings import BOT_NAME
+from core.delivery import PRIORITY_INTERACTIVE, delivery_scheduler
 from keyboards.profile.inline import profile_menu
 
 logger = logging.getLogger(BOT_NAME)
@@ -22,7 +23,12 @@ async def profile(message: types.Message):
         user = result.scalar_one_or_none()
 
     if user:
-        await message.answer("👤 Твой профиль:", reply_markup=profile_menu())
+        await delivery_scheduler.send(
+            message.chat.id,
+            "👤 Твой профиль:",
+            reply_markup=profile_menu(),
+            priority=PRIORITY_INTERACTIVE,
+        )
 
 
 async def close_menu(call: types.CallbackQuery, state: FSMContext = None):
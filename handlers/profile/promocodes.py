@@ -1,5 +1,4 @@
 import logging
-from datetime import timedelta, datetime
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
@@ -7,8 +6,15 @@ from config.settings import BOT_NAME, RECORD_INTERVAL
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database.database import get_session
-from database.models import PromoCode, PromoCodeUsage, User
+from database.models import PromoCode
 from core.redis_client import redis
+from core.user_cache import FIELD_SUBSCRIPTION_END, delete_user_fields
+from core.promo_codes import (
+    ALREADY_USED,
+    EXHAUSTED,
+    get_redemption_count,
+    redeem_promo_code,
+)
 from keyboards.shared.inline import (
     create_close_back_keyboard,
     create_confirmation_keyboard,
@@ -73,22 +79,9 @@ async def enter_promo_code(message: types.Message, state: FSMContext):
                 return
 
     promo_code_id = int(promo_code["id"])
-    usage_count_key = f"promo_code:{promo_code_id}:usage_count"
-    usage_count = await redis.get(usage_count_key)
-
-    if usage_count is None:
-        async with get_session() as session:
-            session: AsyncSession
-            usage_count = await session.execute(
-                select(PromoCodeUsage).filter_by(promo_code_id=promo_code_id)
-            )
-            usage_count = usage_count.scalar()
+    usage_count = await get_redemption_count(promo_code_id)
 
-            usage_count = usage_count if usage_count is not None else 0
-
-            await redis.set(usage_count_key, usage_count, ex=RECORD_INTERVAL)
-
-    if int(usage_count) >= int(promo_code["max_uses"]):
+    if usage_count >= int(promo_code["max_uses"]):
         await message.bot.edit_message_text(
             chat_id=message.chat.id,
             message_id=message_id,
@@ -117,77 +110,31 @@ async def confirm_promo_code(call: types.CallbackQuery, state: FSMContext):
     promo_code_id = data["promo_code_id"]
     user_id = call.from_user.id
 
-    async with get_session() as session:
-        session: AsyncSession
-        promo_code = await session.get(PromoCode, promo_code_id)
-        user = await session.execute(select(User).filter_by(user_id=user_id).limit(1))
-        user = user.scalar_one_or_none()
-
-    user_usage_key = f"user:{user_id}:promo_code_usage:{promo_code_id}"
-    user_usage = await redis.get(user_usage_key)
-
-    if user_usage is None:
-        async with get_session() as session:
-            session: AsyncSession
-            user_usage = await session.execute(
-                select(PromoCodeUsage)
-                .filter_by(user_id=user.id, promo_code_id=promo_code.id)
-                .limit(1)
-            )
-            user_usage = user_usage.scalar_one_or_none()
-
-            if user_usage:
-                await redis.set(user_usage_key, "1", ex=RECORD_INTERVAL)
-                await call.message.edit_text(
-                    "⚠️ Ты уже использовал этот промокод.",
-                    reply_markup=create_close_back_keyboard("profile_back"),
-                )
-                if state:
-                    await state.finish()
-                return
-            else:
-                await redis.set(user_usage_key, "0", ex=RECORD_INTERVAL)
-
-    if user_usage == "1":
-        await call.message.edit_text(
-            "⚠️ Ты уже использовал этот промокод.",
-            reply_markup=create_close_back_keyboard("profile_back"),
-        )
-        if state:
-            await state.finish()
-        return
-
     if call.data == "confirm_promo_code_yes":
         async with get_session() as session:
             session: AsyncSession
-            if promo_code.promo_type == "subscription":
-                subscription_duration_seconds = int(promo_code.value)
-                subscription_duration = timedelta(seconds=subscription_duration_seconds)
-
-                if user.subscription_end:
-                    user.subscription_end += subscription_duration
-                else:
-                    user.subscription_end = datetime.now() + subscription_duration
-
-                session.add(user)
+            promo_code = await session.get(PromoCode, promo_code_id)
 
-            new_usage = PromoCodeUsage(user_id=user.id, promo_code_id=promo_code.id)
-            session.add(new_usage)
+        result = await redeem_promo_code(promo_code, user_id)
 
-            await session.commit()
-
-        usage_count_key = f"promo_code:{promo_code.id}:usage_count"
-        await redis.incr(usage_count_key)
-        await redis.set(user_usage_key, "1", ex=RECORD_INTERVAL)
-
-        subscription_end_key = f"user:{user_id}:subscription_end"
-        await redis.delete(subscription_end_key)
-        logger.debug(f"Кэш subscription_end для пользователя {user_id} удален.")
+        if result == ALREADY_USED:
+            await call.message.edit_text(
+                "⚠️ Ты уже использовал этот промокод.",
+                reply_markup=create_close_back_keyboard("profile_back"),
+            )
+        elif result == EXHAUSTED:
+            await call.message.edit_text(
+                "⚠️ Промокод уже достиг максимального количества использований.",
+                reply_markup=create_close_back_keyboard("profile_back"),
+            )
+        else:
+            await delete_user_fields(user_id, FIELD_SUBSCRIPTION_END)
+            logger.debug("Кэш subscription_end для пользователя %s удален.", user_id)
 
-        await call.message.edit_text(
-            f"✅ Промокод '{promo_code.code}' успешно применен!",
-            reply_markup=create_close_back_keyboard("profile_back"),
-        )
+            await call.message.edit_text(
+                f"✅ Промокод '{promo_code.code}' успешно применен!",
+                reply_markup=create_close_back_keyboard("profile_back"),
+            )
     elif call.data == "confirm_promo_code_no":
         await call.message.edit_text(
             "❌ Применение промокода отменено.",
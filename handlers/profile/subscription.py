@@ -1,4 +1,3 @@
-import json
 import logging
 from aiogram import types
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,8 +7,9 @@ from database.models import User, SubscriptionPlan
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.dispatcher import FSMContext
 from datetime import datetime
-from config.settings import BOT_NAME, RECORD_INTERVAL
-from core.redis_client import redis
+from config.settings import BOT_NAME
+from core.cache_loader import get_or_load
+from core.user_cache import FIELD_SUBSCRIPTION_END, get_user_field, set_user_field
 from keyboards.profile.inline import (
     create_payment_button,
     create_subscription_plans_menu,
@@ -27,10 +27,10 @@ async def show_subscription_menu(call: types.CallbackQuery, state: FSMContext):
     if state:
         await state.finish()
 
-    logger.debug(f"user_id from call: {call.from_user.id}")
+    logger.debug("user_id from call: %s", call.from_user.id)
     user_id = call.from_user.id
 
-    subscription_end = await redis.get(f"user:{user_id}:subscription_end")
+    subscription_end = await get_user_field(user_id, FIELD_SUBSCRIPTION_END)
 
     if not subscription_end:
         async with get_session() as session:
@@ -41,10 +41,10 @@ async def show_subscription_menu(call: types.CallbackQuery, state: FSMContext):
             user = result.scalar_one_or_none()
 
             if user and user.subscription_end:
-                await redis.set(
-                    f"user:{user_id}:subscription_end",
+                await set_user_field(
+                    user_id,
+                    FIELD_SUBSCRIPTION_END,
                     user.subscription_end.isoformat(),
-                    ex=RECORD_INTERVAL,
                 )
                 subscription_end = user.subscription_end.isoformat()
                 logger.debug(
@@ -78,29 +78,24 @@ async def show_subscription_menu(call: types.CallbackQuery, state: FSMContext):
     )
 
 
-async def show_subscription_plans(call: types.CallbackQuery, state: FSMContext):
-    logger.debug(f"show_subscription_plans called for user_id: {call.from_user.id}")
+async def load_subscription_plans():
+    async with get_session() as session:
+        session: AsyncSession
+        result = await session.execute(select(SubscriptionPlan))
+        subscription_plans = result.scalars().all()
 
-    cached_plans = await redis.get("subscription_plans")
+    return [
+        {"id": plan.id, "price": plan.price, "duration": plan.duration.days}
+        for plan in subscription_plans
+    ]
 
-    if cached_plans:
-        subscription_plans = json.loads(cached_plans)
-        logger.debug("Планы подписки загружены из кэша.")
-    else:
-        async with get_session() as session:
-            session: AsyncSession
-            result = await session.execute(select(SubscriptionPlan))
-            subscription_plans = result.scalars().all()
 
-            serialized_plans = [
-                {"id": plan.id, "price": plan.price, "duration": plan.duration.days}
-                for plan in subscription_plans
-            ]
+async def show_subscription_plans(call: types.CallbackQuery, state: FSMContext):
+    logger.debug("show_subscription_plans called for user_id: %s", call.from_user.id)
 
-            await redis.set(
-                "subscription_plans", json.dumps(serialized_plans), ex=RECORD_INTERVAL
-            )
-            logger.debug("Планы подписки загружены из базы данных и сохранены в кэш.")
+    subscription_plans = await get_or_load(
+        "subscription_plans", load_subscription_plans
+    )
 
     await call.message.edit_text(
         "💳 Выбери план подписки:",
@@ -111,7 +106,7 @@ async def show_subscription_plans(call: types.CallbackQuery, state: FSMContext):
 
 
 async def select_subscription_plan(call: types.CallbackQuery, state: FSMContext):
-    logger.debug(f"select_subscription_plan called with data: {call.data}")
+    logger.debug("select_subscription_plan called with data: %s", call.data)
 
     plan_id = int(call.data.split("_")[-1])
 
@@ -4,33 +4,28 @@ from aiogram import types
 from aiogram.dispatcher import Dispatcher
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from core.parser.main import get_interval_setting, get_user_directions
+from core.user_directions import get_user_directions
 from database.database import get_session
 from database.models import User
 from datetime import datetime
 from keyboards.profile.reply import main_menu
 from config.settings import BOT_NAME, RECORD_INTERVAL
-from core.redis_client import redis
+from core.delivery import PRIORITY_INTERACTIVE, delivery_scheduler
+from core.user_cache import FIELD_SUBSCRIPTION_END, get_user_field, set_user_field
+from core.settings_cache import get_settings
+from core.active_searchers import (
+    activate_searcher,
+    deactivate_searcher,
+    is_searcher_active,
+    refresh_searcher,
+)
 from keyboards.shared.inline import create_close_keyboard
 
 logger = logging.getLogger(BOT_NAME)
 
 
-def get_user_subscription_key(user_id):
-    return f"user:{user_id}:subscription_end"
-
-
-def get_user_directions_key(user_id):
-    return f"user:{user_id}:directions"
-
-
-def get_user_search_key(user_id):
-    return f"user:{user_id}:is_search_active"
-
-
 async def get_user_subscription_end(user_id):
-    subscription_key = get_user_subscription_key(user_id)
-    subscription_end = await redis.get(subscription_key)
+    subscription_end = await get_user_field(user_id, FIELD_SUBSCRIPTION_END)
 
     if subscription_end:
         subscription_end = (
@@ -48,9 +43,10 @@ async def get_user_subscription_end(user_id):
 
             if user and user.subscription_end:
                 subscription_end = user.subscription_end.isoformat()
-                await redis.set(subscription_key, subscription_end, ex=RECORD_INTERVAL)
+                await set_user_field(user_id, FIELD_SUBSCRIPTION_END, subscription_end)
                 logger.debug(
-                    f"Дата окончания подписки загружена из базы и сохранена в кэш для пользователя {user_id}."
+                    "Дата окончания подписки загружена из базы и сохранена в кэш для пользователя %s.",
+                    user_id,
                 )
             else:
                 subscription_end = None
@@ -59,35 +55,22 @@ async def get_user_subscription_end(user_id):
 
 
 async def get_user_search_status(user_id):
-    search_key = get_user_search_key(user_id)
-    is_search_active = await redis.get(search_key)
+    is_search_active = await is_searcher_active(user_id)
 
     # Получаем интервал времени для статуса поиска пользователей из настроек
-    user_search_ttl = await get_interval_setting("user_search_ttl") or "30"
-    user_search_ttl = int(user_search_ttl)
+    user_search_ttl = get_settings().user_search_ttl
 
-    if is_search_active:
-        is_search_active = (
-            is_search_active.decode("utf-8")
-            if isinstance(is_search_active, bytes)
-            else is_search_active
-        )
-        logger.debug(
-            f"Статус поиска для пользователя {user_id} загружен из кэша: {is_search_active}"
-        )
-    else:
-        is_search_active = "0"
-        logger.debug(
-            f"Статус поиска для пользователя {user_id} не найден в кэше, устанавливается значение по умолчанию: {is_search_active}"
-        )
+    logger.debug("Статус поиска для пользователя %s: %s", user_id, is_search_active)
 
-    if is_search_active == "1":
-        await redis.expire(search_key, user_search_ttl)
+    if is_search_active:
+        await refresh_searcher(user_id, user_search_ttl)
         logger.debug(
-            f"TTL для статуса поиска пользователя {user_id} обновлен на {user_search_ttl} секунд."
+            "TTL для статуса поиска пользователя %s обновлен на %s секунд.",
+            user_id,
+            user_search_ttl,
         )
 
-    return is_search_active == "1"
+    return is_search_active
 
 
 async def cmd_start_search(message: types.Message):
@@ -99,32 +82,38 @@ async def cmd_start_search(message: types.Message):
         not subscription_end
         or datetime.fromisoformat(subscription_end) < datetime.now()
     ):
-        await message.answer(
-            "⚠️ У тебя нет активной подписки.", reply_markup=create_close_keyboard()
+        await delivery_scheduler.send(
+            message.chat.id,
+            "⚠️ У тебя нет активной подписки.",
+            reply_markup=create_close_keyboard(),
+            priority=PRIORITY_INTERACTIVE,
         )
         logger.debug(
-            f"Попытка начать поиск пользователем {user_id} без активной подписки."
+            "Попытка начать поиск пользователем %s без активной подписки.", user_id
         )
         return
 
     user_directions = await get_user_directions(user_id)
     if not user_directions:
-        await message.answer(
+        await delivery_scheduler.send(
+            message.chat.id,
             "⚠️ Ты не выбрал ни одного направления для поиска.",
             reply_markup=create_close_keyboard(),
+            priority=PRIORITY_INTERACTIVE,
         )
         logger.debug(
-            f"Пользователь {user_id} попытался начать поиск без выбранных направлений."
+            "Пользователь %s попытался начать поиск без выбранных направлений.", user_id
         )
         return
 
-    search_key = get_user_search_key(user_id)
-    await redis.set(search_key, "1", ex=RECORD_INTERVAL)
-    logger.debug(f"Поиск для пользователя {user_id} начат и статус кэширован в Redis.")
+    await activate_searcher(user_id, RECORD_INTERVAL)
+    logger.debug("Поиск для пользователя %s начат и статус кэширован в Redis.", user_id)
 
-    await message.answer(
+    await delivery_scheduler.send(
+        message.chat.id,
         "🔍 Поиск начат!",
         reply_markup=main_menu(True),
+        priority=PRIORITY_INTERACTIVE,
     )
 
 
@@ -132,15 +121,16 @@ async def cmd_stop_search(message: types.Message):
     await message.delete()
     user_id = message.from_user.id
 
-    search_key = get_user_search_key(user_id)
-    await redis.delete(search_key)
+    await deactivate_searcher(user_id)
     logger.debug(
-        f"Поиск для пользователя {user_id} остановлен и статус удалён из Redis."
+        "Поиск для пользователя %s остановлен и статус удалён из Redis.", user_id
     )
 
-    await message.answer(
+    await delivery_scheduler.send(
+        message.chat.id,
         "❌ Поиск прекращен.",
         reply_markup=main_menu(False),
+        priority=PRIORITY_INTERACTIVE,
     )
 
 
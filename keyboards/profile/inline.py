@@ -147,13 +147,13 @@ def create_profile_edit_job_keywords_pagination_keyboard(
     keywords, page, selected_keywords, has_next, callback_prefix, direction_id
 ):
     keyboard = InlineKeyboardMarkup()
-    logger.debug(f"Creating keyboard for page {page} with keywords: {keywords}")
+    logger.debug("Creating keyboard for page %s with keywords: %s", page, keywords)
 
     for keyword in keywords:
         item_text = f"📌 {keyword}" if keyword in selected_keywords else keyword
         callback_data = f"profile_edit_keyword_{keyword}"
         keyboard.add(InlineKeyboardButton(item_text, callback_data=callback_data))
-        logger.debug(f"Added button: {item_text} with callback_data: {callback_data}")
+        logger.debug("Added button: %s with callback_data: %s", item_text, callback_data)
 
     if has_next:
         keyboard.add(
@@ -267,8 +267,8 @@ def create_subscription_plans_menu(subscription_plans):
     keyboard = InlineKeyboardMarkup()
 
     for plan in subscription_plans:
-        button_text = f"⭐️ {plan.price} руб. за {plan.duration.days} дней"
-        callback_data = f"select_subscription_plan_{plan.id}"
+        button_text = f"⭐️ {plan['price']} руб. за {plan['duration']} дней"
+        callback_data = f"select_subscription_plan_{plan['id']}"
         keyboard.add(
             InlineKeyboardButton(text=button_text, callback_data=callback_data)
         )
@@ -2,12 +2,8 @@ import logging
 from aiogram import types
 from aiogram.dispatcher.middlewares import BaseMiddleware
 from aiogram.dispatcher.handler import CancelHandler
-from database.models import User, BotSetting
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from database.database import get_session
-from core.redis_client import redis
-from config.settings import BOT_NAME, RECORD_INTERVAL
+from config.settings import BOT_NAME
+from middlewares.user_context import get_update_user_id, load_user_context
 
 logger = logging.getLogger(BOT_NAME)
 
@@ -17,76 +13,23 @@ class TechWorksMiddleware(BaseMiddleware):
         super().__init__()
 
     async def on_pre_process_update(self, update: types.Update, data: dict):
-        tech_works_status = await redis.get("settings:technical_works")
-
-        if tech_works_status is None:
-            async with get_session() as session:
-                session: AsyncSession
-                result = await session.execute(select(BotSetting).limit(1))
-                bot_setting = result.scalar_one_or_none()
-
-                if bot_setting:
-                    tech_works_status = bot_setting.technical_works
-                    await redis.set(
-                        "settings:technical_works",
-                        tech_works_status,
-                        ex=RECORD_INTERVAL,
-                    )
-                    logger.debug(
-                        "Технические работы загружены из базы и сохранены в кэш."
-                    )
-                else:
-                    tech_works_status = "0"
-                    await redis.set(
-                        "settings:technical_works",
-                        tech_works_status,
-                        ex=RECORD_INTERVAL,
-                    )
-                    logger.debug(
-                        "В базе не найдено настроек, технические работы отключены по умолчанию."
-                    )
-
-        if tech_works_status == "1":
-            user_id = None
-            if update.message:
-                user_id = update.message.from_user.id
-            elif update.callback_query:
-                user_id = update.callback_query.from_user.id
-            elif update.inline_query:
-                user_id = update.inline_query.from_user.id
+        user_id = get_update_user_id(update)
+        user_context = data.get("user_context") or await load_user_context(user_id)
 
+        if user_context["technical_works"]:
             if user_id is None:
                 logger.debug("Технические работы активны. Обновление заблокировано.")
                 raise CancelHandler()
 
-            is_admin = await redis.get(f"user:{user_id}:is_admin")
-
-            if is_admin is None:
-                async with get_session() as session:
-                    session: AsyncSession
-                    result = await session.execute(
-                        select(User).filter_by(user_id=user_id).limit(1)
-                    )
-                    user = result.scalar_one_or_none()
-
-                    if user:
-                        is_admin = "1" if user.is_admin else "0"
-                        await redis.set(
-                            f"user:{user_id}:is_admin", is_admin, ex=RECORD_INTERVAL
-                        )
-                    else:
-                        is_admin = "0"
-                        await redis.set(
-                            f"user:{user_id}:is_admin", is_admin, ex=RECORD_INTERVAL
-                        )
-
-            if is_admin == "1":
+            if user_context["is_admin"]:
                 logger.debug(
-                    f"Пользователь {user_id} является администратором. Пропускаем обновление."
+                    "Пользователь %s является администратором. Пропускаем обновление.",
+                    user_id,
                 )
                 return
 
             logger.debug(
-                f"Технические работы активны. Обновление от пользователя {user_id} заблокировано."
+                "Технические работы активны. Обновление от пользователя %s заблокировано.",
+                user_id,
             )
             raise CancelHandler()
@@ -0,0 +1,99 @@
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+from database.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.database import get_session
+from core.logger import set_log_context
+from core.settings_cache import get_settings
+from core.user_cache import (
+    FIELD_IS_ADMIN,
+    FIELD_IS_BANNED,
+    get_user_cache,
+    set_user_fields,
+)
+from config.settings import BOT_NAME
+
+logger = logging.getLogger(BOT_NAME)
+
+# aiogram создает отдельный data для каждого уровня обработки, поэтому
+# контекст, загруженный для update, передается хэндлерам через ContextVar
+current_user_context: ContextVar[Optional[dict]] = ContextVar(
+    "current_user_context", default=None
+)
+
+
+def get_update_user_id(update: types.Update) -> Optional[int]:
+    if update.message:
+        return update.message.from_user.id
+    elif update.callback_query:
+        return update.callback_query.from_user.id
+    elif update.inline_query:
+        return update.inline_query.from_user.id
+    return None
+
+
+async def load_user_context(user_id: Optional[int]) -> dict:
+    # Флаг технических работ берется из настроек в памяти процесса
+    technical_works = get_settings().technical_works
+    user_cache = {}
+
+    if user_id is not None:
+        # Все кэшированные поля пользователя читаются одним HGETALL
+        user_cache = await get_user_cache(user_id)
+
+    if user_id is not None and (
+        FIELD_IS_BANNED not in user_cache or FIELD_IS_ADMIN not in user_cache
+    ):
+        async with get_session() as session:
+            session: AsyncSession
+            result = await session.execute(
+                select(User.is_banned, User.is_admin)
+                .filter_by(user_id=user_id)
+                .limit(1)
+            )
+            user = result.one_or_none()
+
+        flags = {
+            FIELD_IS_BANNED: str(bool(user and user.is_banned)).lower(),
+            FIELD_IS_ADMIN: "1" if user and user.is_admin else "0",
+        }
+        await set_user_fields(user_id, flags)
+        user_cache.update(flags)
+
+        logger.debug(
+            "Контекст пользователя %s загружен из базы и сохранен в кэш.", user_id
+        )
+
+    return {
+        "user_id": user_id,
+        "technical_works": technical_works,
+        "is_banned": user_cache.get(FIELD_IS_BANNED) == "true",
+        "is_admin": user_cache.get(FIELD_IS_ADMIN) == "1",
+        "user_cache": user_cache,
+    }
+
+
+class UserContextMiddleware(BaseMiddleware):
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        user_id = get_update_user_id(update)
+        set_log_context(update.update_id, user_id)
+        user_context = await load_user_context(user_id)
+        current_user_context.set(user_context)
+        data["user_context"] = user_context
+
+    async def on_pre_process_message(self, message: types.Message, data: dict):
+        data["user_context"] = current_user_context.get()
+
+    async def on_pre_process_callback_query(
+        self, call: types.CallbackQuery, data: dict
+    ):
+        data["user_context"] = current_user_context.get()
+
+    async def on_pre_process_inline_query(
+        self, inline_query: types.InlineQuery, data: dict
+    ):
+        data["user_context"] = current_user_context.get()
@@ -0,0 +1,55 @@
+import random
+
+# Синтетический корпус: небольшой словарь, как у реальных заказов
+VOCABULARY = [
+    "требуется",
+    "нужен",
+    "ищем",
+    "разработчик",
+    "разработчика",
+    "дизайнер",
+    "дизайнера",
+    "копирайтер",
+    "копирайтера",
+    "маркетолог",
+    "таргетолог",
+    "сайт",
+    "сайта",
+    "лендинг",
+    "логотип",
+    "бот",
+    "телеграм",
+    "python",
+    "django",
+    "figma",
+    "оплата",
+    "бюджет",
+    "рублей",
+    "срочно",
+    "удаленно",
+    "проект",
+    "проекта",
+    "задача",
+    "задачи",
+    "опыт",
+    "работы",
+    "портфолио",
+    "пишите",
+    "личку",
+    "заказ",
+    "заказа",
+    "статьи",
+    "тексты",
+    "продвижение",
+    "реклама",
+]
+POSTS_COUNT = 2000
+POST_LENGTH = 60
+
+
+def build_corpus():
+    rng = random.Random(42)
+    return [
+        " ".join(rng.choice(VOCABULARY) for _ in range(POST_LENGTH))
+        for _ in range(POSTS_COUNT)
+    ]
@@ -0,0 +1,6 @@
+@echo off
+cd ..
+set PYTHONDONTWRITEBYTECODE=1
+set PYTHONPATH=%PYTHONPATH%;..
+python -m scripts.benchmark_delivery_queue
+pause
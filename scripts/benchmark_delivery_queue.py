@@ -0,0 +1,124 @@
+import asyncio
+import statistics
+import time
+from core.delivery_stream import (
+    DeliveryStreamConsumer,
+    get_dead_letter_key,
+    get_retry_key,
+    publish_delivery,
+)
+from core.redis_client import redis
+
+# Отдельный поток, чтобы бот не отправил тестовые сообщения
+STREAM = "benchmark:deliveries"
+
+DELIVERIES = 10_000
+ENQUEUE_CONCURRENCY = 50
+# Равномерная нагрузка: RATE доставок в минуту в течение DURATION секунд
+RATE = 10_000
+DURATION = 60
+# Имитация отправки через Bot API. Измеряется только очередь: настоящая
+# отправка ограничена лимитом бота (core.delivery.GLOBAL_RATE в секунду)
+SEND_TIME = 0.001
+
+
+async def send(chat_id: int, text: str, **kwargs) -> None:
+    await asyncio.sleep(SEND_TIME)
+
+
+async def cleanup() -> None:
+    await redis.delete(STREAM, get_retry_key(STREAM), get_dead_letter_key(STREAM))
+    async for key in redis.scan_iter(match=f"{STREAM}:sent:*", count=1000):
+        await redis.delete(key)
+
+
+async def wait_delivered(consumer: DeliveryStreamConsumer, count: int) -> None:
+    while consumer.delivered < count:
+        await asyncio.sleep(0.01)
+
+
+async def benchmark_burst() -> None:
+    post_ids = iter(range(DELIVERIES))
+
+    async def producer() -> None:
+        for post_id in post_ids:
+            await publish_delivery(
+                post_id, "Тестовая вакансия", post_id=f"burst:{post_id}", stream=STREAM
+            )
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(ENQUEUE_CONCURRENCY)))
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"Постановка: {DELIVERIES} за {elapsed:.2f} сек., "
+        f"{DELIVERIES / elapsed * 60:.0f} доставок/мин."
+    )
+
+    consumer = DeliveryStreamConsumer("benchmark", stream=STREAM, send=send)
+    started_at = time.perf_counter()
+    consumer.start()
+    await wait_delivered(consumer, DELIVERIES)
+    elapsed = time.perf_counter() - started_at
+    await consumer.stop()
+    print(
+        f"Отправка: {DELIVERIES} за {elapsed:.2f} сек., "
+        f"{DELIVERIES / elapsed * 60:.0f} доставок/мин."
+    )
+
+
+async def benchmark_steady() -> None:
+    consumer = DeliveryStreamConsumer("benchmark", stream=STREAM, send=send)
+    consumer.start()
+
+    total = RATE * DURATION // 60
+    interval = 60 / RATE
+    enqueue_times = []
+    started_at = time.perf_counter()
+    for post_id in range(total):
+        delay = started_at + post_id * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        enqueue_started_at = time.perf_counter()
+        await publish_delivery(
+            post_id, "Тестовая вакансия", post_id=f"steady:{post_id}", stream=STREAM
+        )
+        enqueue_times.append(time.perf_counter() - enqueue_started_at)
+
+    await wait_delivered(consumer, total)
+    elapsed = time.perf_counter() - started_at
+    latencies = sorted(consumer._latencies)
+    stats = await consumer.lag()
+    await consumer.stop()
+
+    enqueue_times.sort()
+    print(
+        f"Равномерно {RATE} доставок/мин.: {total} за {elapsed:.2f} сек., "
+        f"pending {stats['pending']}, lag {stats['lag']}"
+    )
+    print(
+        f"Постановка: avg {statistics.fmean(enqueue_times) * 1000:.2f} мс, "
+        f"p99 {enqueue_times[int(len(enqueue_times) * 0.99)] * 1000:.2f} мс"
+    )
+    print(
+        f"От постановки до отправки: p50 {latencies[len(latencies) // 2] * 1000:.0f} мс, "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} мс"
+    )
+
+
+async def run():
+    await cleanup()
+    try:
+        await benchmark_burst()
+        await cleanup()
+        await benchmark_steady()
+    finally:
+        await cleanup()
+        await redis.aclose()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
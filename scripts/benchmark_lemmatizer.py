@@ -0,0 +1,36 @@
+import time
+from core.parser.lemmatizer import LemmaCache, Lemmatizer
+from scripts.benchmark_corpus import build_corpus
+
+
+def run(lemmatizer: Lemmatizer, corpus):
+    tokens_count = 0
+    started_at = time.perf_counter()
+    for post in corpus:
+        tokens_count += len(lemmatizer.lemmatize(post))
+    elapsed = time.perf_counter() - started_at
+    return tokens_count, elapsed
+
+
+def main():
+    corpus = build_corpus()
+
+    uncached = Lemmatizer()
+    cache = LemmaCache()
+    cached = Lemmatizer(cache=cache)
+
+    # Прогрев: загрузка модели не должна попасть в замер
+    uncached.lemmatize(corpus[0])
+    cached.nlp
+
+    for name, lemmatizer in (("без кэша", uncached), ("с кэшем", cached)):
+        tokens_count, elapsed = run(lemmatizer, corpus)
+        print(
+            f"{name}: {tokens_count} токенов за {elapsed:.2f} сек., "
+            f"{tokens_count / elapsed:.0f} токенов/сек."
+        )
+
+    print(f"Статистика кэша: {cache.stats}")
+
+
+main()
@@ -0,0 +1,79 @@
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+CALLS = 100_000
+
+user_id = 123456789
+directions = [
+    {"id": index, "direction_name": f"direction {index}"} for index in range(5)
+]
+
+
+def measure(logger: logging.Logger, lazy: bool) -> float:
+    started_at = time.perf_counter()
+    if lazy:
+        for _ in range(CALLS):
+            logger.debug("Направления пользователя %s: %s", user_id, directions)
+    else:
+        for _ in range(CALLS):
+            logger.debug(f"Направления пользователя {user_id}: {directions}")
+    return (time.perf_counter() - started_at) / CALLS * 1_000_000
+
+
+def make_logger(name: str, handler: logging.Handler, level: int) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(level)
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    logger.addHandler(handler)
+    return logger
+
+
+def main():
+    with tempfile.TemporaryDirectory() as log_dir:
+        file_handler = RotatingFileHandler(
+            f"{log_dir}/sync.log",
+            maxBytes=6 * 1024 * 1024,
+            backupCount=6,
+            encoding="utf-16",
+        )
+        sync_logger = make_logger("benchmark.sync", file_handler, logging.DEBUG)
+        disabled_logger = make_logger(
+            "benchmark.disabled", logging.NullHandler(), logging.INFO
+        )
+
+        log_queue = queue.SimpleQueue()
+        queue_file_handler = RotatingFileHandler(
+            f"{log_dir}/queue.log",
+            maxBytes=6 * 1024 * 1024,
+            backupCount=6,
+            encoding="utf-16",
+        )
+        queue_file_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        listener = QueueListener(log_queue, queue_file_handler)
+        listener.start()
+        queue_logger = make_logger(
+            "benchmark.queue", QueueHandler(log_queue), logging.DEBUG
+        )
+
+        for name, logger, lazy in (
+            ("DEBUG выключен, f-строка", disabled_logger, False),
+            ("DEBUG выключен, ленивые аргументы", disabled_logger, True),
+            ("RotatingFileHandler в потоке вызова", sync_logger, True),
+            ("QueueHandler + QueueListener", queue_logger, True),
+        ):
+            print(f"{name}: {measure(logger, lazy):.2f} мкс на вызов")
+
+        listener.stop()
+        file_handler.close()
+        queue_file_handler.close()
+
+
+main()
@@ -0,0 +1,46 @@
+import time
+from config.settings import NLP_BATCH_SIZE
+from core.parser.lemmatizer import Lemmatizer
+from scripts.benchmark_corpus import build_corpus
+
+
+def run_single(lemmatizer: Lemmatizer, corpus):
+    # Как раньше: каждый пост целиком проходит через nlp() по одному
+    started_at = time.perf_counter()
+    for post in corpus:
+        [token.lemma_ for token in lemmatizer.nlp(post)]
+    return time.perf_counter() - started_at
+
+
+def run_pipe(lemmatizer: Lemmatizer, corpus):
+    started_at = time.perf_counter()
+    for doc in lemmatizer.nlp.pipe(corpus, batch_size=NLP_BATCH_SIZE):
+        [token.lemma_ for token in doc]
+    return time.perf_counter() - started_at
+
+
+def run_batched(lemmatizer: Lemmatizer, corpus):
+    started_at = time.perf_counter()
+    for offset in range(0, len(corpus), NLP_BATCH_SIZE):
+        lemmatizer.lemmatize_many(corpus[offset : offset + NLP_BATCH_SIZE])
+    return time.perf_counter() - started_at
+
+
+def main():
+    corpus = build_corpus()
+    lemmatizer = Lemmatizer()
+    lemmatizer.nlp
+
+    for name, run in (
+        ("по одному посту", run_single),
+        (f"nlp.pipe, пакеты по {NLP_BATCH_SIZE}", run_pipe),
+        (f"lemmatize_many, пакеты по {NLP_BATCH_SIZE}", run_batched),
+    ):
+        elapsed = run(lemmatizer, corpus)
+        print(
+            f"{name}: {len(corpus)} постов за {elapsed:.2f} сек., "
+            f"{len(corpus) / elapsed:.0f} постов/сек."
+        )
+
+
+main()
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import sys
+import time
+import aiohttp
+from aiohttp import web
+from core.webhook import WebhookReceiver, create_webhook_app
+
+HOST = "127.0.0.1"
+PORT = 8090
+PATH = "/webhook"
+WORKERS = 2
+QUEUE_SIZE = 1000
+CONCURRENCY = 16
+# Имитация обработки update хэндлерами
+PROCESS_TIME = 0.005
+
+UPDATES = 20_000
+CLIENT_CONNECTIONS = 64
+
+
+def make_update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": update_id % 1000, "type": "private"},
+            "from": {"id": update_id % 1000, "is_bot": False, "first_name": "Test"},
+            "text": "/start",
+        },
+    }
+
+
+async def run_server() -> None:
+    async def process_update(update: dict) -> None:
+        await asyncio.sleep(PROCESS_TIME)
+
+    receiver = WebhookReceiver(process_update, QUEUE_SIZE, CONCURRENCY)
+    runner = web.AppRunner(create_webhook_app(receiver, PATH))
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT, reuse_port=True).start()
+    await asyncio.Event().wait()
+
+
+def server_main() -> None:
+    asyncio.run(run_server())
+
+
+async def run_load(url: str) -> None:
+    latencies = []
+    statuses = {}
+    update_ids = iter(range(UPDATES))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        for update_id in update_ids:
+            started_at = time.perf_counter()
+            async with session.post(url, json=make_update(update_id)) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - started_at)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=CLIENT_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(CLIENT_CONNECTIONS)))
+        elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    print(
+        f"Update: {UPDATES} за {elapsed:.2f} сек., {UPDATES / elapsed:.0f} update/сек."
+    )
+    print(
+        f"Задержка ответа: p50 {latencies[len(latencies) // 2] * 1000:.2f} мс, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} мс"
+    )
+    print(f"Ответы: {statuses}")
+
+
+def main():
+    # Без аргумента поднимаем локальный сервер с имитацией обработки,
+    # с аргументом нагружаем уже запущенный webhook по указанному URL
+    if len(sys.argv) > 1:
+        asyncio.run(run_load(sys.argv[1]))
+        return
+
+    servers = [multiprocessing.Process(target=server_main) for _ in range(WORKERS)]
+    for server in servers:
+        server.start()
+    time.sleep(1)
+
+    try:
+        asyncio.run(run_load(f"http://{HOST}:{PORT}{PATH}"))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
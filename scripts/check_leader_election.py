@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+PROCESSES = 3
+POSTS = 3000
+POST_INTERVAL = 0.005
+TTL = 2
+# Лидер замораживается через PAUSE_AFTER секунд и размораживается, когда
+# лидерство уже у другого процесса; следующий лидер через KILL_AFTER секунд
+# убивается без корректного завершения
+PAUSE_AFTER = 3
+KILL_AFTER = 2
+
+NAME = "check_leader_election"
+CURSOR_KEY = f"{NAME}:cursor"
+DELIVERIES_KEY = f"{NAME}:deliveries"
+REJECTED_KEY = f"{NAME}:rejected"
+
+# Выполняется через LeaderElection.register_fenced_script: процесс,
+# потерявший аренду, но еще не заметивший этого, ничего не запишет
+DELIVER_SCRIPT = """
+redis.call("RPUSH", KEYS[2], ARGV[2])
+redis.call("SET", KEYS[3], ARGV[2])
+return 1
+"""
+
+
+async def run_candidate() -> None:
+    from core.leader import LeaderElection
+    from core.redis_client import redis
+
+    election = LeaderElection(NAME, ttl=TTL, renew_interval=0.5)
+    deliver = election.register_fenced_script(DELIVER_SCRIPT)
+
+    async def parse_posts() -> None:
+        while True:
+            post_id = int(await redis.get(CURSOR_KEY) or 0) + 1
+            if post_id > POSTS:
+                return
+            if not await deliver(keys=[DELIVERIES_KEY, CURSOR_KEY], args=[post_id]):
+                await redis.incr(REJECTED_KEY)
+                return
+            await asyncio.sleep(POST_INTERVAL)
+
+    await election.run(parse_posts)
+
+
+def candidate_main() -> None:
+    asyncio.run(run_candidate())
+
+
+async def get_state():
+    from core.redis_client import redis
+
+    leader = await redis.get(f"leader:{NAME}")
+    cursor = int(await redis.get(CURSOR_KEY) or 0)
+    return leader, cursor
+
+
+async def wait_new_leader(old_leader: str) -> str:
+    while True:
+        leader, _ = await get_state()
+        if leader is not None and leader != old_leader:
+            return leader
+        await asyncio.sleep(0.05)
+
+
+def get_pid(leader: str) -> int:
+    # Токен лидера: hostname:pid:uuid
+    return int(leader.split(":")[1])
+
+
+async def check(processes) -> bool:
+    from core.redis_client import redis
+
+    await asyncio.sleep(PAUSE_AFTER)
+    leader, cursor = await get_state()
+    os.kill(get_pid(leader), signal.SIGSTOP)
+    print(f"Лидер {get_pid(leader)} заморожен на посте {cursor}.")
+
+    started_at = time.monotonic()
+    new_leader = await wait_new_leader(leader)
+    print(
+        f"Лидерство перешло к {get_pid(new_leader)} "
+        f"через {time.monotonic() - started_at:.1f} сек."
+    )
+    await asyncio.sleep(1)
+    os.kill(get_pid(leader), signal.SIGCONT)
+    print(f"Процесс {get_pid(leader)} разморожен.")
+
+    await asyncio.sleep(KILL_AFTER)
+    leader, cursor = await get_state()
+    os.kill(get_pid(leader), signal.SIGKILL)
+    print(f"Лидер {get_pid(leader)} убит на посте {cursor}.")
+
+    started_at = time.monotonic()
+    new_leader = await wait_new_leader(leader)
+    print(
+        f"Лидерство перешло к {get_pid(new_leader)} "
+        f"через {time.monotonic() - started_at:.1f} сек."
+    )
+    while cursor < POSTS:
+        await asyncio.sleep(0.5)
+        _, cursor = await get_state()
+
+    for process in processes:
+        process.kill()
+        process.join()
+
+    deliveries = [int(post_id) for post_id in await redis.lrange(DELIVERIES_KEY, 0, -1)]
+    duplicates = len(deliveries) - len(set(deliveries))
+    missing = POSTS - len(set(deliveries))
+    rejected = int(await redis.get(REJECTED_KEY) or 0)
+    print(
+        f"Доставлено {len(deliveries)}, повторов {duplicates}, пропусков {missing}, "
+        f"отклонено записей бывших лидеров {rejected}."
+    )
+    await redis.delete(f"leader:{NAME}", CURSOR_KEY, DELIVERIES_KEY, REJECTED_KEY)
+    return not duplicates and not missing
+
+
+def main():
+    processes = [
+        multiprocessing.Process(target=candidate_main) for _ in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+
+    passed = asyncio.run(check(processes))
+    print("OK" if passed else "FAIL")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
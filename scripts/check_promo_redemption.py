@@ -0,0 +1,56 @@
+import asyncio
+import random
+import sys
+import time
+from core.redis_client import redis
+from core.promo_codes import (
+    RESERVED,
+    get_redemption_keys,
+    load_script,
+    reserve_promo_code,
+)
+
+# Отрицательный id не пересекается с настоящими промокодами
+PROMO_CODE_ID = -1
+USERS = 5000
+MAX_USES = 100
+# Каждый пользователь жмет "применить" несколько раз подряд
+ATTEMPTS_PER_USER = 3
+
+
+async def main():
+    await redis.delete(*get_redemption_keys(PROMO_CODE_ID))
+    # Тестового промокода нет в базе: множество помечается загруженным
+    # заранее, чтобы попытки не уходили в Postgres
+    await load_script(keys=get_redemption_keys(PROMO_CODE_ID), args=[])
+
+    attempts = [
+        user_id for user_id in range(1, USERS + 1) for _ in range(ATTEMPTS_PER_USER)
+    ]
+    random.shuffle(attempts)
+
+    started_at = time.perf_counter()
+    results = await asyncio.gather(
+        *(reserve_promo_code(PROMO_CODE_ID, user_id, MAX_USES) for user_id in attempts)
+    )
+    elapsed = time.perf_counter() - started_at
+
+    reserved_users = [
+        user_id for user_id, result in zip(attempts, results) if result == RESERVED
+    ]
+    reserved_count = await redis.scard(get_redemption_keys(PROMO_CODE_ID)[0])
+    await redis.delete(*get_redemption_keys(PROMO_CODE_ID))
+
+    print(f"Попыток: {len(attempts)} за {elapsed:.2f} сек.")
+    print(f"Успешных резервов: {len(reserved_users)}, в Redis: {reserved_count}")
+
+    failed = (
+        len(reserved_users) != MAX_USES
+        or len(set(reserved_users)) != len(reserved_users)
+        or reserved_count != MAX_USES
+    )
+    print("FAIL" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+asyncio.run(main())
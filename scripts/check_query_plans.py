@@ -0,0 +1,63 @@
+import asyncio
+import json
+import logging
+import sys
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from config.settings import DATABASE_URL, LOG_LEVEL
+
+# Горячие запросы бота. Для каждого должен использоваться индекс.
+HOT_QUERIES = {
+    "users by telegram id": "SELECT * FROM users WHERE user_id = 1",
+    "user directions": "SELECT * FROM user_job_directions WHERE user_id = 1",
+    "promo code by code": "SELECT * FROM promo_codes WHERE code = 'code'",
+    "promo code usage by user": (
+        "SELECT * FROM promo_code_usage WHERE user_id = 1 AND promo_code_id = 1"
+    ),
+    "load history range": (
+        "SELECT * FROM load_history "
+        "WHERE timestamp >= now() - interval '1 day' ORDER BY timestamp"
+    ),
+}
+
+
+def find_seq_scans(plan: dict) -> list:
+    seq_scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        seq_scans.append(plan.get("Relation Name"))
+    for subplan in plan.get("Plans", []):
+        seq_scans.extend(find_seq_scans(subplan))
+    return seq_scans
+
+
+async def main():
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=True if LOG_LEVEL is logging.DEBUG else False,
+    )
+    failed = False
+
+    try:
+        async with engine.connect() as conn:
+            # На маленьких таблицах планировщик честно выбирает Seq Scan.
+            # С выключенным seqscan он остается только там, где нет индекса.
+            await conn.execute(text("SET enable_seqscan = off"))
+
+            for name, query in HOT_QUERIES.items():
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                seq_scans = find_seq_scans(plan[0]["Plan"])
+
+                if seq_scans:
+                    failed = True
+                    print(f"FAIL {name}: Seq Scan по {', '.join(seq_scans)}")
+                else:
+                    print(f"OK   {name}")
+    finally:
+        await engine.dispose()
+
+    sys.exit(1 if failed else 0)
+
+
+asyncio.run(main())
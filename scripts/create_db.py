@@ -14,6 +14,7 @@ from config.settings import (
     POSTGRES_DB,
 )
 from database.models import Base
+from database.migrations import apply_migrations
 
 load_dotenv()
 
@@ -56,6 +57,9 @@ async def create_tables():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         print("Таблицы успешно созданы.")
+
+        # Новая база уже соответствует моделям, миграции только отмечаются
+        await apply_migrations(engine)
     except OperationalError as e:
         print(f"Ошибка подключения к базе данных: {e}")
     finally:
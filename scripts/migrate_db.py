@@ -0,0 +1,26 @@
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.exc import OperationalError
+from config.settings import DATABASE_URL, LOG_LEVEL
+from database.migrations import apply_migrations
+
+
+async def main():
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=True if LOG_LEVEL is logging.DEBUG else False,
+    )
+    try:
+        applied = await apply_migrations(engine)
+        if not applied:
+            print("Схема базы данных актуальна, миграций для применения нет.")
+        for migration in applied:
+            print(f"Применена миграция {migration.version}: {migration.description}")
+    except OperationalError as e:
+        print(f"Ошибка подключения к базе данных: {e}")
+    finally:
+        await engine.dispose()
+
+
+asyncio.run(main())
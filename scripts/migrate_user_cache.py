@@ -0,0 +1,17 @@
+import asyncio
+from core.user_cache import migrate_legacy_user_keys
+
+
+async def main():
+    stats = await migrate_legacy_user_keys()
+    print(f"Перенесено {stats['keys']} ключей для {stats['users']} пользователей.")
+    print(f"Удалено устаревших ключей: {stats['deleted']}.")
+
+    if stats["bytes_before"]:
+        saved = stats["bytes_before"] - stats["bytes_after"]
+        print(f"Память до переноса: {stats['bytes_before']} байт.")
+        print(f"Память после переноса: {stats['bytes_after']} байт.")
+        print(f"Экономия: {saved} байт ({saved / stats['bytes_before']:.0%}).")
+
+
+asyncio.run(main())
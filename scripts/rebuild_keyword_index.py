@@ -0,0 +1,10 @@
+import asyncio
+from core.parser.keyword_index import rebuild_keyword_index
+
+
+async def main():
+    keywords_count = await rebuild_keyword_index()
+    print(f"Индекс ключевых слов перестроен: {keywords_count} ключевых слов.")
+
+
+asyncio.run(main())
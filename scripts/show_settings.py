@@ -0,0 +1,12 @@
+import asyncio
+from core.settings_cache import settings_cache
+
+
+async def main():
+    await settings_cache.refresh()
+    print("Действующие настройки бота:")
+    for line in settings_cache.settings.describe():
+        print(f"  {line}")
+
+
+asyncio.run(main())
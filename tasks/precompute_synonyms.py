@@ -0,0 +1,24 @@
+import asyncio
+import logging
+from core.parser.keyword_matcher import invalidate_keyword_matcher
+from core.settings_cache import get_settings
+from core.parser.synonyms import is_synonyms_stale, precompute_synonyms
+from config.settings import BOT_NAME
+
+logger = logging.getLogger(BOT_NAME)
+
+
+async def precompute_synonyms_table() -> None:
+    is_first_run = True
+
+    while True:
+        settings = get_settings()
+        try:
+            if is_first_run or await is_synonyms_stale():
+                if await precompute_synonyms(settings.max_synonyms):
+                    await invalidate_keyword_matcher()
+                is_first_run = False
+        except Exception as e:
+            logger.error(f"Ошибка при расчете таблицы синонимов: {str(e)}")
+
+        await asyncio.sleep(settings.update_interval)
@@ -1,47 +1,61 @@
 import asyncio
-from datetime import datetime
-import psutil
+import os
+import socket
+import time
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.parser.main import get_interval_setting
+from core.metrics import downsample, metrics_sampler
+from core.settings_cache import get_settings
 from database.database import get_session
 from database.models import LoadHistory
-from config.settings import BOT_NAME
+from config.settings import BOT_NAME, METRICS_DOWNSAMPLE_PERIOD
 import logging
 
 logger = logging.getLogger(BOT_NAME)
 
 
+async def flush_load_history(final: bool = False) -> int:
+    # Незавершенное окно усреднения остается в буфере до следующего
+    # сброса: иначе одно окно давало бы две строки с одним timestamp.
+    # При остановке процесса сбрасывается все.
+    until = None
+    if not final:
+        until = time.time() // METRICS_DOWNSAMPLE_PERIOD * METRICS_DOWNSAMPLE_PERIOD
+
+    rows = downsample(metrics_sampler.drain(until))
+    if not rows:
+        return 0
+
+    # Метрики снимает каждый процесс бота; строки различаются по процессу
+    process = f"{socket.gethostname()}:{os.getpid()}"
+    for row in rows:
+        row["process"] = process
+
+    async with get_session() as session:
+        session: AsyncSession
+        try:
+            await session.execute(insert(LoadHistory), rows)
+            await session.commit()
+            logger.debug("Записана история загрузки: %s строк.", len(rows))
+        except Exception as e:
+            await session.rollback()
+            logger.debug("Ошибка при записи истории загрузки: %s", e)
+    return len(rows)
+
+
 async def record_load_history() -> None:
+    metrics_sampler.start()
+
     while True:
-        record_interval = int(
-            await get_interval_setting("record_load_history_interval") or 3600
+        record_interval = get_settings().record_load_history_interval
+        # Сбрасываем буфер не реже, чем он успевает заполниться, с запасом
+        # на оставленное в нем незавершенное окно
+        buffer_span = metrics_sampler.samples.maxlen * metrics_sampler.interval
+        await asyncio.sleep(
+            min(record_interval, max(1, buffer_span - METRICS_DOWNSAMPLE_PERIOD))
         )
-        try:
-            cpu_load = psutil.cpu_percent(interval=1)
-            memory_info = psutil.virtual_memory()
-            memory_load = memory_info.percent
-            average_load = (cpu_load + memory_load) / 2
-
-            load_entry = LoadHistory(
-                timestamp=datetime.now(),
-                cpu_load=int(cpu_load),
-                memory_load=int(memory_load),
-                average_load=int(average_load),
-            )
-
-            async with get_session() as session:
-                session: AsyncSession
-                try:
-                    session.add(load_entry)
-                    await session.commit()
-                    logger.debug(
-                        f"Записана история загрузки: CPU {cpu_load}%, RAM {memory_load}%, Средняя {average_load}%"
-                    )
-                except Exception as e:
-                    await session.rollback()
-                    logger.debug(f"Ошибка при записи истории загрузки: {str(e)}")
 
+        try:
+            await flush_load_history()
         except Exception as e:
             logger.error(f"Ошибка при сборе данных о загрузке: {str(e)}")
-
-        await asyncio.sleep(record_interval)
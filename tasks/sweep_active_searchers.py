@@ -0,0 +1,18 @@
+import asyncio
+import logging
+from core.active_searchers import sweep_expired_searchers
+from core.settings_cache import get_settings
+from config.settings import BOT_NAME
+
+logger = logging.getLogger(BOT_NAME)
+
+
+async def sweep_active_searchers() -> None:
+    while True:
+        sweep_interval = get_settings().user_search_ttl
+        try:
+            await sweep_expired_searchers()
+        except Exception as e:
+            logger.error(f"Ошибка при очистке реестра активных поисков: {str(e)}")
+
+        await asyncio.sleep(sweep_interval)